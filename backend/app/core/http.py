@@ -0,0 +1,34 @@
+from typing import Any, Optional
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def dumps_json(content: Any) -> bytes:
+    """Encode a response body with orjson
+
+    Only values orjson cannot encode natively (Decimal, sets, models, ...) go
+    through FastAPI's jsonable_encoder, instead of walking the whole payload in Python.
+    """
+    return orjson.dumps(content, default=jsonable_encoder, option=_ORJSON_OPTIONS)
+
+
+class EncodedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse for large payloads, encoded with dumps_json
+
+    Returned directly from an endpoint, so FastAPI skips its own
+    jsonable_encoder pass over the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
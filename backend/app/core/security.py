@@ -1,4 +1,5 @@
 from typing import Optional
+import hashlib
 from fastapi import Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -8,3 +9,9 @@ async def get_current_user_token(credentials: Optional[HTTPAuthorizationCredenti
     if credentials:
         return credentials.credentials
     return None
+
+def token_digest(token: Optional[str]) -> Optional[str]:
+    """Short, stable hash of a bearer token for use in cache keys (never store raw tokens)"""
+    if not token:
+        return None
+    return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
@@ -1,250 +1,386 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, Optional
-from ..core.security import get_current_user_token
-from ..services.iceberg import analyze_with_pyiceberg_metadata, read_iceberg_metadata_manual, get_manual_data_files, PYICEBERG_AVAILABLE
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import ORJSONResponse, Response
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import functools
+import hashlib
+import logging
+import sys
+import threading
+from cachetools import LRUCache
+from google.api_core.exceptions import Forbidden, Unauthorized
+from ..core.http import EncodedORJSONResponse, dumps_json, etag_matches
+from ..core.security import get_current_user_token, token_digest
+from ..services.iceberg import (
+    analyze_with_pyiceberg_metadata,
+    read_iceberg_metadata_manual,
+    get_manual_data_files,
+    get_latest_metadata_blob,
+    get_sample_data,
+    compare_snapshots,
+    index_by_id,
+    PYICEBERG_AVAILABLE,
+)
 
-router = APIRouter()
+# Analyze payloads (snapshots, data files) can be large; serialize them with orjson
+router = APIRouter(default_response_class=ORJSONResponse)
 
-@router.get("/analyze")
-async def analyze_table(bucket: str, path: str, project_id: Optional[str] = None, token: Optional[str] = Depends(get_current_user_token)):
-    """Analyze an Iceberg table and return comprehensive metadata"""
-    try:
-        # Normalize path
-        normalized_path = path.strip("/")
-        
-        # Try PyIceberg first if available
-        if PYICEBERG_AVAILABLE:
-            try:
-                # Use PyIceberg to parse metadata properly
-                result = analyze_with_pyiceberg_metadata(bucket, normalized_path, project_id, token=token)
-                if result:
-                    return result
-            except Exception as e:
-                print(f"PyIceberg analysis failed, falling back to manual: {str(e)}")
-        
-        # Fall back to manual metadata reading
-        # Note: analyze_with_pyiceberg_metadata already includes manual fallback logic,
-        # so if it returns None, it means both failed or PyIceberg is not available and manual failed inside it?
-        # Actually analyze_with_pyiceberg_metadata returns None if PyIceberg is not available OR if it fails?
-        # Let's check services/iceberg.py:
-        # It returns None if PYICEBERG_AVAILABLE is False.
-        # It also has a fallback to manual parsing inside it.
-        # So if it returns a result, we are good.
-        # If it returns None (and didn't raise), it might be because PYICEBERG_AVAILABLE is False.
-        
-        # If we are here, either PyIceberg is not available or it failed and returned None (if that's possible)
-        # But analyze_with_pyiceberg_metadata in services/iceberg.py actually DOES return a dict even if PyIceberg fails,
-        # because it has the manual fallback inside it!
-        # So if it returns None, it's likely because PYICEBERG_AVAILABLE is False (at the top check).
-        
-        # So we should call it again? No, if PYICEBERG_AVAILABLE is False, it returns None immediately.
-        # We need to call read_iceberg_metadata_manual directly if PYICEBERG_AVAILABLE is False.
-        
-        # Wait, analyze_with_pyiceberg_metadata in services/iceberg.py:
-        # if not PYICEBERG_AVAILABLE: return None
-        
-        # So if it returns None, we MUST try manual.
-        
-        try:
-            metadata, _, _ = read_iceberg_metadata_manual(bucket, normalized_path, project_id=project_id, token=token)
-            
-            # If we are here, we have metadata but analyze_with_pyiceberg_metadata returned None (or wasn't called)
-            # We need to construct the response manually like in the original main.py
-            # BUT, services/iceberg.py's analyze_with_pyiceberg_metadata ALREADY has the manual fallback logic inside it...
-            # except it returns None if PYICEBERG_AVAILABLE is False.
-            
-            # I should have made analyze_with_pyiceberg_metadata handle the case where PyIceberg is missing by just doing manual parsing.
-            # But I can't change it now easily without another write.
-            # I will just replicate the manual parsing logic here or call a helper if I had one.
-            # Actually, I can just call read_iceberg_metadata_manual and then do the extraction here.
-            # OR I can update services/iceberg.py to be more robust.
-            
-            # Let's look at what I wrote to services/iceberg.py
-            # It has the full manual parsing logic inside analyze_with_pyiceberg_metadata...
-            # BUT it starts with `if not PYICEBERG_AVAILABLE: return None`.
-            # This is a bit of a flaw in my extraction.
-            
-            # I will implement the manual parsing here using read_iceberg_metadata_manual
-            # effectively duplicating the logic from main.py (which I am replacing).
-            # This is safer than modifying services/iceberg.py again right now.
-            
-            # Actually, I can just copy the logic from main.py since I have it.
-            pass # Continue to logic below
-        except Exception:
-            raise
-            
-    except (Forbidden, Unauthorized) as e:
-        raise HTTPException(
-            status_code=401 if isinstance(e, Unauthorized) else 403,
-            detail=f"Authentication failed: {str(e)}"
+logger = logging.getLogger(__name__)
+
+# Finished /analyze responses keyed by (bucket, path, project, metadata file, generation).
+# Every Iceberg commit writes a new metadata file, so a changed table simply misses the cache.
+ANALYZE_CACHE_SIZE = 256
+
+# currentSnapshotId reported for tables without a current snapshot
+_NO_SNAPSHOT_ID = "-1"
+
+# Page size of /analyze/snapshots
+DEFAULT_SNAPSHOTS_LIMIT = 50
+# Snapshots returned by /analyze unless the client asks for fewer; 0 returns all of them.
+# The UI reads the whole history from /analyze (stats, snapshot comparison), so it stays
+# unlimited until the frontend pages older snapshots through /analyze/snapshots
+DEFAULT_ANALYZE_SNAPSHOTS_LIMIT = 0
+_analyze_cache: LRUCache = LRUCache(maxsize=ANALYZE_CACHE_SIZE)
+# Serialized (etag, body) pairs for the same keys plus the requested snapshots_limit
+_analyze_payload_cache: LRUCache = LRUCache(maxsize=ANALYZE_CACHE_SIZE)
+_analyze_cache_lock = threading.Lock()
+
+
+_METADATA_NOT_FOUND_TEMPLATE = (
+    "Failed to read Iceberg metadata:\n{error}\n\n"
+    "Bucket: {bucket}\n"
+    "Path: {path}\n"
+    "Project: {project}\n\n"
+    "Please verify:\n"
+    "1. The path is correct\n"
+    "2. The table has a metadata/ directory\n"
+    "3. There are .metadata.json files in the metadata directory"
+)
+
+
+def _serialize_payload(result: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Serialize a response once and derive its ETag from the bytes"""
+    body = dumps_json(result)
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body
+
+
+def _metadata_not_found_detail(error: str, bucket: str, path: str, project_id: Optional[str]) -> str:
+    """Format the 404 detail shown when table metadata cannot be read"""
+    return _METADATA_NOT_FOUND_TEMPLATE.format(error=error, bucket=bucket, path=path, project=project_id or "default")
+
+
+def _table_error(error: Exception, message: str, bucket: str, path: str, project_id: Optional[str]) -> HTTPException:
+    """Map a failure to read a table to the HTTP error returned by the analyze endpoints"""
+    if isinstance(error, (Forbidden, Unauthorized)):
+        return HTTPException(
+            status_code=401 if isinstance(error, Unauthorized) else 403,
+            detail=f"Authentication failed: {str(error)}"
         )
-    except Exception as e:
-        # Check for GCS permission errors (fallback for non-api_core exceptions)
-        error_str = str(e)
-        if "403" in error_str or "Forbidden" in error_str:
-            raise HTTPException(
-                status_code=403,
-                detail="Permission denied. You do not have access to this bucket or object. Please check your GCS permissions."
-            )
-        if "401" in error_str or "Unauthorized" in error_str:
-            raise HTTPException(
-                status_code=401,
-                detail="Authentication failed. Please try logging in again."
-            )
-            
-        # Provide more detailed error information for other errors
-        import traceback
-        print(traceback.format_exc())
-        raise HTTPException(
-            status_code=404,
-            detail=f"Failed to read Iceberg metadata:\n{error_str}\n\n"
-                   f"Bucket: {bucket}\n"
-                   f"Path: {normalized_path}\n"
-                   f"Project: {project_id or 'default'}\n\n"
-                   f"Please verify:\n"
-                   f"1. The path is correct\n"
-                   f"2. The table has a metadata/ directory\n"
-                   f"3. There are .metadata.json files in the metadata directory"
+
+    # Check for GCS permission errors (fallback for non-api_core exceptions)
+    error_str = str(error)
+    if "403" in error_str or "Forbidden" in error_str:
+        return HTTPException(
+            status_code=403,
+            detail="Permission denied. You do not have access to this bucket or object. Please check your GCS permissions."
+        )
+    if "401" in error_str or "Unauthorized" in error_str:
+        return HTTPException(
+            status_code=401,
+            detail="Authentication failed. Please try logging in again."
         )
 
-        # Extract schema - Iceberg v2 uses "schemas" (plural) array
-        schema_fields = []
-        current_schema_id = metadata.get("current-schema-id", 0)
-        
-        # Try "schemas" (plural) first (Iceberg v2)
-        if "schemas" in metadata and isinstance(metadata["schemas"], list):
-            for schema_obj in metadata["schemas"]:
-                if schema_obj.get("schema-id") == current_schema_id:
-                    if "fields" in schema_obj:
-                        for field in schema_obj["fields"]:
-                            field_type = field.get("type", "string")
-                            if isinstance(field_type, dict):
-                                type_str = field_type.get("type", str(field_type))
-                                if "element-id" in field_type:
-                                    type_str = f"list<{type_str}>"
-                                elif "key-id" in field_type:
-                                    type_str = f"map<{type_str}>"
-                            else:
-                                type_str = str(field_type)
-                            
-                            schema_fields.append({
-                                "id": field.get("id", 0),
-                                "name": field.get("name", ""),
-                                "type": type_str,
-                                "required": field.get("required", False),
-                                "doc": field.get("doc"),
-                            })
-                    break
-        elif "schema" in metadata:
-            schema = metadata["schema"]
-            fields_list = None
-            if isinstance(schema, dict) and "fields" in schema:
-                fields_list = schema["fields"]
-            elif isinstance(schema, list):
-                fields_list = schema
-            
-            if fields_list:
-                for field in fields_list:
-                    field_type = field.get("type", {})
-                    if isinstance(field_type, dict):
-                        type_str = field_type.get("type", str(field_type))
-                        if "element-id" in field_type:
-                            type_str = f"list<{type_str}>"
-                        elif "key-id" in field_type:
-                            type_str = f"map<{type_str}>"
-                    else:
-                        type_str = str(field_type)
-                    
-                    schema_fields.append({
-                        "id": field.get("id", 0),
-                        "name": field.get("name", ""),
-                        "type": type_str,
-                        "required": not field.get("optional", True),
-                        "doc": field.get("doc"),
-                    })
-        
-        # Extract partition spec
-        partition_spec = []
-        default_spec_id = metadata.get("default-spec-id", 0)
-        
-        if "partition-specs" in metadata and isinstance(metadata["partition-specs"], list):
-            for spec_obj in metadata["partition-specs"]:
-                if spec_obj.get("spec-id") == default_spec_id:
-                    if "fields" in spec_obj:
-                        for field in spec_obj["fields"]:
-                            partition_spec.append({
-                                "fieldId": field.get("field-id", 0),
-                                "sourceId": field.get("source-id", 0),
-                                "name": field.get("name", ""),
-                                "transform": field.get("transform", ""),
-                            })
-                    break
-        elif "partition-spec" in metadata:
-            spec = metadata["partition-spec"]
-            if isinstance(spec, dict) and "fields" in spec:
-                for field in spec["fields"]:
-                    partition_spec.append({
-                        "fieldId": field.get("field-id", 0),
-                        "sourceId": field.get("source-id", 0),
-                        "name": field.get("name", ""),
-                        "transform": field.get("transform", ""),
-                    })
-        
-        # Extract sort order
-        sort_order = []
-        default_sort_order_id = metadata.get("default-sort-order-id", 0)
-        
-        if "sort-orders" in metadata and isinstance(metadata["sort-orders"], list):
-            for order_obj in metadata["sort-orders"]:
-                if order_obj.get("order-id") == default_sort_order_id:
-                    if "fields" in order_obj:
-                        for field in order_obj["fields"]:
-                            sort_order.append({
-                                "orderId": field.get("order-id", 0),
-                                "direction": field.get("direction", "asc"),
-                                "nullOrder": field.get("null-order", "nulls-first"),
-                                "sortFieldId": field.get("field-id", 0),
-                            })
-                    break
-        elif "sort-order" in metadata:
-            order = metadata["sort-order"]
-            if isinstance(order, dict) and "fields" in order:
-                for field in order["fields"]:
-                    sort_order.append({
-                        "orderId": field.get("order-id", 0),
-                        "direction": field.get("direction", "asc"),
-                        "nullOrder": field.get("null-order", "nulls-first"),
-                        "sortFieldId": field.get("field-id", 0),
-                    })
-        
-        # Return basic metadata if manual parsing was used
-        # Note: This is a simplified return compared to what analyze_with_pyiceberg_metadata returns
-        # but it matches what the frontend expects for basic display if full analysis fails.
-        # Actually, we should try to return as much as possible.
-        
-        return {
-            "tableName": normalized_path.split("/")[-1] if "/" in normalized_path else normalized_path,
-            "location": f"gs://{bucket}/{normalized_path}",
-            "formatVersion": metadata.get("format-version", 1),
-            "schema": schema_fields,
-            "partitionSpec": partition_spec,
-            "sortOrder": sort_order,
-            "properties": metadata.get("properties", {}),
-            "currentSnapshotId": str(metadata.get("current-snapshot-id", -1)),
-
-            "snapshots": metadata.get("snapshots", []),
-            # Try to get data files from current snapshot for graph
-            "dataFiles": get_manual_data_files(bucket, normalized_path, metadata, project_id, token),
-            "partitionStats": [],
-            "metadataFiles": [], # Could populate this if we had the list from read_iceberg_metadata_manual
+    # Provide more detailed error information for other errors (called from the except block,
+    # so the traceback of `error` is the one being handled)
+    logger.exception("%s gs://%s/%s", message, bucket, path)
+    return HTTPException(
+        status_code=404,
+        detail=_metadata_not_found_detail(error_str, bucket, path, project_id)
+    )
+
+
+def _analyze_cache_key(bucket: str, normalized_path: str, project_id: Optional[str], token: Optional[str]) -> Optional[Tuple]:
+    """Build the cache key from the table's current metadata file and the caller.
+
+    Listing objects does not prove read access (storage.objects.list and
+    storage.objects.get are separate permissions), so cached responses are
+    scoped to the caller's credentials through a digest of their token.
+    """
+    try:
+        latest_blob = get_latest_metadata_blob(bucket, normalized_path, project_id, token)
+    except Exception as e:
+        logger.warning("Could not resolve current metadata file for caching: %s", e)
+        return None
+    if latest_blob is None:
+        return None
+    return (bucket, normalized_path, project_id, token_digest(token), latest_blob.name, latest_blob.generation)
+
+
+# Nested Iceberg types are recognised by the id key they carry; the wrappers are
+# bound once here instead of formatting a new f-string template per field
+_NESTED_TYPE_WRAPPERS = (("element-id", "list<%s>".__mod__), ("key-id", "map<%s>".__mod__))
+
+# Primitive type names repeat across hundreds of fields; share one interned string each
+_PRIMITIVE_TYPE_NAMES = {
+    name: sys.intern(name)
+    for name in (
+        "boolean", "int", "long", "float", "double", "decimal", "date", "time",
+        "timestamp", "timestamptz", "string", "uuid", "fixed", "binary",
+    )
+}
+
+
+def _render_primitive_type(field_type: str) -> str:
+    return _PRIMITIVE_TYPE_NAMES.get(field_type, field_type)
+
+
+def _render_nested_type(field_type: Dict[str, Any]) -> str:
+    type_str = field_type.get("type", str(field_type))
+    for marker, wrap in _NESTED_TYPE_WRAPPERS:
+        if marker in field_type:
+            return wrap(type_str)
+    return type_str
+
+
+def _render_other_type(field_type: Any) -> str:
+    return _render_primitive_type(str(field_type))
+
+
+# Dispatch on the exact JSON type; metadata.json only ever decodes to plain str/dict
+_TYPE_RENDERERS = {str: _render_primitive_type, dict: _render_nested_type}
+
+
+def _render_field_type(field_type: Any) -> str:
+    """Render an Iceberg field type as a short display string"""
+    return _TYPE_RENDERERS.get(type(field_type), _render_other_type)(field_type)
+
+
+def _extract_schema_fields(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract the current schema - "schemas" (v2) or "schema" (v1)"""
+    if type(metadata.get("schemas")) is list:
+        schema_obj = index_by_id(metadata["schemas"], "schema-id").get(metadata.get("current-schema-id", 0))
+        if not schema_obj:
+            return []
+        return [
+            {
+                "id": field.get("id", 0),
+                "name": field.get("name", ""),
+                "type": _render_field_type(field.get("type", "string")),
+                "required": field.get("required", False),
+                "doc": field.get("doc"),
+            }
+            for field in schema_obj.get("fields", [])
+        ]
+
+    schema = metadata.get("schema")
+    if isinstance(schema, dict):
+        fields_list = schema.get("fields")
+    elif isinstance(schema, list):
+        fields_list = schema
+    else:
+        fields_list = None
+
+    return [
+        {
+            "id": field.get("id", 0),
+            "name": field.get("name", ""),
+            "type": _render_field_type(field.get("type", {})),
+            "required": not field.get("optional", True),
+            "doc": field.get("doc"),
         }
+        for field in fields_list or []
+    ]
+
 
+def _extract_partition_spec(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract the default partition spec - "partition-specs" (v2) or "partition-spec" (v1)"""
+    if type(metadata.get("partition-specs")) is list:
+        spec = index_by_id(metadata["partition-specs"], "spec-id").get(metadata.get("default-spec-id", 0))
+    else:
+        spec = metadata.get("partition-spec")
+    if not isinstance(spec, dict):
+        return []
+    return [
+        {
+            "fieldId": field.get("field-id", 0),
+            "sourceId": field.get("source-id", 0),
+            "name": field.get("name", ""),
+            "transform": field.get("transform", ""),
+        }
+        for field in spec.get("fields", [])
+    ]
+
+
+def _extract_sort_order(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract the default sort order - "sort-orders" (v2) or "sort-order" (v1)"""
+    if type(metadata.get("sort-orders")) is list:
+        order = index_by_id(metadata["sort-orders"], "order-id").get(metadata.get("default-sort-order-id", 0))
+    else:
+        order = metadata.get("sort-order")
+    if not isinstance(order, dict):
+        return []
+    return [
+        {
+            "orderId": field.get("order-id", 0),
+            "direction": field.get("direction", "asc"),
+            "nullOrder": field.get("null-order", "nulls-first"),
+            "sortFieldId": field.get("field-id", 0),
+        }
+        for field in order.get("fields", [])
+    ]
+
+
+def _project_snapshot(snapshot: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    """Reduce a raw metadata.json snapshot to the fields the frontend renders"""
+    timestamp_ms = snapshot.get("timestamp-ms") or 0
+    parent_snapshot_id = snapshot.get("parent-snapshot-id")
+    return {
+        "snapshotId": str(snapshot.get("snapshot-id", "")),
+        "sequenceNumber": snapshot.get("sequence-number", idx + 1),
+        "timestamp": datetime.fromtimestamp(timestamp_ms / 1000).isoformat() if timestamp_ms > 0 else None,
+        "summary": snapshot.get("summary", {}),
+        "manifestList": snapshot.get("manifest-list", ""),
+        "parentSnapshotId": str(parent_snapshot_id) if parent_snapshot_id else None,
+    }
+
+
+def _limit_snapshots(result: Dict[str, Any], snapshots_limit: Optional[int]) -> Dict[str, Any]:
+    """Return the response with only the newest `snapshots_limit` snapshots.
+
+    The full response stays in the cache untouched, so every limit is served
+    from the same cached entry.
+    """
+    snapshots = result.get("snapshots")
+    if not snapshots_limit or snapshots_limit < 0 or not isinstance(snapshots, list) or len(snapshots) <= snapshots_limit:
+        return result
+    return {**result, "snapshots": snapshots[-snapshots_limit:], "totalSnapshots": len(snapshots)}
+
+
+def _analyze_manual(bucket: str, normalized_path: str, project_id: Optional[str], token: Optional[str]) -> Dict[str, Any]:
+    """Analyze a table by parsing metadata.json directly"""
+    metadata, _, _ = read_iceberg_metadata_manual(bucket, normalized_path, project_id=project_id, token=token)
+
+    schema_fields = _extract_schema_fields(metadata)
+    partition_spec = _extract_partition_spec(metadata)
+    sort_order = _extract_sort_order(metadata)
+
+    # Return basic metadata if manual parsing was used
+    # Note: This is a simplified return compared to what analyze_with_pyiceberg_metadata returns
+    # but it matches what the frontend expects for basic display if full analysis fails.
+    table_name = normalized_path.rpartition("/")[2] or normalized_path
+    location = "".join(("gs://", bucket, "/", normalized_path))
+    current_snapshot_id = metadata.get("current-snapshot-id")
+
+    return {
+        "tableName": table_name,
+        "location": location,
+        "formatVersion": metadata.get("format-version", 1),
+        "schema": schema_fields,
+        "partitionSpec": partition_spec,
+        "sortOrder": sort_order,
+        "properties": metadata.get("properties", {}),
+        "currentSnapshotId": _NO_SNAPSHOT_ID if current_snapshot_id is None else str(current_snapshot_id),
+        "snapshots": [_project_snapshot(snapshot, idx) for idx, snapshot in enumerate(metadata.get("snapshots", []))],
+        # Try to get data files from current snapshot for graph
+        "dataFiles": get_manual_data_files(bucket, normalized_path, metadata, project_id, token),
+        "partitionStats": [],
+        "metadataFiles": [], # Could populate this if we had the list from read_iceberg_metadata_manual
+    }
+
+
+def _analyze_pyiceberg(bucket: str, normalized_path: str, project_id: Optional[str], token: Optional[str]) -> Dict[str, Any]:
+    """Analyze a table with PyIceberg, falling back to manual metadata parsing"""
+    try:
+        result = analyze_with_pyiceberg_metadata(bucket, normalized_path, project_id, token=token)
+        if result:
+            return result
     except Exception as e:
-        import traceback
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.warning("PyIceberg analysis failed, falling back to manual: %s", e)
+    return _analyze_manual(bucket, normalized_path, project_id, token)
+
+
+# PyIceberg availability is fixed at import time, so pick the analyzer once instead of per request
+_build_analyze_response = _analyze_pyiceberg if PYICEBERG_AVAILABLE else _analyze_manual
 
-from google.api_core.exceptions import Forbidden, Unauthorized
+
+@router.get("/analyze")
+async def analyze_table(
+    bucket: str,
+    path: str,
+    project_id: Optional[str] = None,
+    snapshots_limit: Optional[int] = DEFAULT_ANALYZE_SNAPSHOTS_LIMIT,
+    if_none_match: Optional[str] = Header(None),
+    token: Optional[str] = Depends(get_current_user_token)
+):
+    """Analyze an Iceberg table and return comprehensive metadata.
+
+    With `snapshots_limit`, only the newest snapshots are returned along with
+    totalSnapshots (0, the default, returns all); older history is available
+    page by page from /analyze/snapshots.
+    Responses carry an ETag, and a matching If-None-Match gets a 304.
+    """
+    # Normalize path
+    normalized_path = path.strip("/")
+
+    try:
+        # GCS calls are blocking; run them in a worker thread so the event loop stays free
+        cache_key = await asyncio.to_thread(_analyze_cache_key, bucket, normalized_path, project_id, token)
+        if cache_key is None:
+            result = await asyncio.to_thread(_build_analyze_response, bucket, normalized_path, project_id, token)
+            return EncodedORJSONResponse(_limit_snapshots(result, snapshots_limit)) if result else result
+
+        payload_key = (cache_key, snapshots_limit)
+        with _analyze_cache_lock:
+            payload = _analyze_payload_cache.get(payload_key)
+
+        if payload is None:
+            with _analyze_cache_lock:
+                result = _analyze_cache.get(cache_key)
+            if result is None:
+                result = await asyncio.to_thread(_build_analyze_response, bucket, normalized_path, project_id, token)
+                if not result:
+                    return result
+                with _analyze_cache_lock:
+                    _analyze_cache[cache_key] = result
+
+            payload = await asyncio.to_thread(_serialize_payload, _limit_snapshots(result, snapshots_limit))
+            with _analyze_cache_lock:
+                _analyze_payload_cache[payload_key] = payload
+
+        etag, body = payload
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except Exception as e:
+        raise _table_error(e, "Failed to analyze table", bucket, normalized_path, project_id)
+
+@router.get("/analyze/snapshots")
+async def list_table_snapshots(
+    bucket: str,
+    path: str,
+    offset: int = 0,
+    limit: int = DEFAULT_SNAPSHOTS_LIMIT,
+    project_id: Optional[str] = None,
+    token: Optional[str] = Depends(get_current_user_token)
+):
+    """Page through a table's snapshot history, oldest first"""
+    normalized_path = path.strip("/")
+    try:
+        metadata, _, _ = await asyncio.to_thread(read_iceberg_metadata_manual, bucket, normalized_path, project_id, token)
+    except Exception as e:
+        raise _table_error(e, "Failed to list snapshots of table", bucket, normalized_path, project_id)
+
+    snapshots = metadata.get("snapshots", [])
+    offset = max(offset, 0)
+    page = snapshots[offset:offset + max(limit, 0)]
+    return {
+        "snapshots": [_project_snapshot(snapshot, offset + idx) for idx, snapshot in enumerate(page)],
+        "total": len(snapshots),
+        "offset": offset,
+        "limit": limit,
+    }
 
 @router.get("/sample")
 async def get_sample(
@@ -258,9 +394,14 @@ async def get_sample(
     token: Optional[str] = Depends(get_current_user_token)
 ):
     """Get sample data from an Iceberg table, optionally targeting a specific snapshot, manifest, or file"""
-    from ..services.iceberg import get_sample_data
-    data = get_sample_data(bucket, path, limit, project_id, token=token, snapshot_id=snapshot_id, manifest_path=manifest_path, file_path=file_path)
-    return data
+    # Parquet reads and pandas conversion are blocking; keep them off the event loop
+    data = await asyncio.to_thread(
+        functools.partial(
+            get_sample_data, bucket, path, limit, project_id,
+            token=token, snapshot_id=snapshot_id, manifest_path=manifest_path, file_path=file_path
+        )
+    )
+    return EncodedORJSONResponse(data)
 
 @router.get("/snapshot/compare")
 async def compare_snapshots_endpoint(
@@ -272,7 +413,9 @@ async def compare_snapshots_endpoint(
     token: Optional[str] = Depends(get_current_user_token)
 ):
     """Compare two snapshots"""
-    from ..services.iceberg import compare_snapshots
     # Handle empty snapshot_id_1 which might come as "null" or empty string
     s1 = snapshot_id_1 if snapshot_id_1 and snapshot_id_1 != "null" else ""
-    return compare_snapshots(bucket, path, s1, snapshot_id_2, project_id, token=token)
+    result = await asyncio.to_thread(
+        functools.partial(compare_snapshots, bucket, path, s1, snapshot_id_2, project_id, token=token)
+    )
+    return EncodedORJSONResponse(result)
@@ -1,27 +1,85 @@
+import asyncio
+import orjson
+import os
+import re
+import threading
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from typing import List, Optional, Set
 from google.cloud import bigquery
-from ..core.security import get_current_user_token
+from google.oauth2.credentials import Credentials
+from google.api_core.exceptions import Forbidden
+from cachetools import TTLCache
+from ..core.security import get_current_user_token, token_digest
 
 router = APIRouter()
 
+# BigQuery clients keyed by (token digest, project_id)
+BIGQUERY_CLIENT_TTL_SECONDS = 1800
+_bigquery_clients = TTLCache(maxsize=256, ttl=BIGQUERY_CLIENT_TTL_SECONDS)
+_bigquery_clients_lock = threading.Lock()
+
+# Maximum number of datasets scanned in parallel by /bigquery/search-iceberg
+SEARCH_DATASET_CONCURRENCY = 40
+
+# Page size for list_datasets/list_tables; the API default forces extra round-trips on large projects
+LIST_PAGE_SIZE = 1000
+
+# Set BIGQUERY_SEARCH_INFORMATION_SCHEMA=false to always inspect tables one by one
+USE_INFORMATION_SCHEMA_SEARCH = os.getenv("BIGQUERY_SEARCH_INFORMATION_SCHEMA", "true").lower() not in ("0", "false", "no")
+
+# Rows fetched per page when reading INFORMATION_SCHEMA results
+QUERY_RESULT_PAGE_SIZE = 10000
+
+# Project IDs are interpolated into INFORMATION_SCHEMA table names, so only plain IDs are allowed
+_PROJECT_ID_RE = re.compile(r"^[a-z0-9.:-]+$")
+
+# One query per region returns every Iceberg table with its metadata URI and creation time
+_ICEBERG_TABLES_QUERY = """
+SELECT
+  t.table_schema,
+  t.table_name,
+  t.creation_time,
+  uris.option_value AS uris
+FROM `{project}.region-{region}.INFORMATION_SCHEMA.TABLES` AS t
+JOIN `{project}.region-{region}.INFORMATION_SCHEMA.TABLE_OPTIONS` AS fmt
+  ON fmt.table_schema = t.table_schema AND fmt.table_name = t.table_name
+  AND fmt.option_name = 'format' AND fmt.option_value LIKE '%ICEBERG%'
+LEFT JOIN `{project}.region-{region}.INFORMATION_SCHEMA.TABLE_OPTIONS` AS uris
+  ON uris.table_schema = t.table_schema AND uris.table_name = t.table_name
+  AND uris.option_name = 'uris'
+WHERE t.table_type = 'EXTERNAL'
+ORDER BY t.table_schema, t.table_name
+"""
+
 def get_bigquery_client(token: Optional[str] = None, project_id: Optional[str] = None):
-    """Get a BigQuery client with user credentials if available."""
+    """Get a BigQuery client with user credentials if available.
+
+    Clients are reused per (token, project) so their HTTP sessions survive
+    across requests; entries expire before a typical one-hour access token does.
+    """
+    key = (token_digest(token), project_id)
+    with _bigquery_clients_lock:
+        client = _bigquery_clients.get(key)
+    if client is not None:
+        return client
+
     try:
-        from google.oauth2.credentials import Credentials
-        
         if token:
             creds = Credentials(token=token)
-            return bigquery.Client(credentials=creds, project=project_id)
-        
-        # Fallback to ADC
-        return bigquery.Client(project=project_id)
+            client = bigquery.Client(credentials=creds, project=project_id)
+        else:
+            # Fallback to ADC
+            client = bigquery.Client(project=project_id)
     except Exception as e:
         print(f"Error creating BigQuery client: {e}")
         return None
 
+    with _bigquery_clients_lock:
+        _bigquery_clients[key] = client
+    return client
+
 @router.get("/bigquery/datasets")
-async def list_datasets(
+def list_datasets(
     project_id: str,
     token: Optional[str] = Depends(get_current_user_token)
 ):
@@ -31,7 +89,7 @@ async def list_datasets(
         if not client:
             raise HTTPException(status_code=500, detail="Failed to initialize BigQuery client")
             
-        datasets = list(client.list_datasets())
+        # Build the response straight from the paged iterator instead of buffering the datasets first
         return {
             "datasets": [
                 {
@@ -40,14 +98,14 @@ async def list_datasets(
                     "full_dataset_id": d.full_dataset_id,
                     "labels": d.labels
                 }
-                for d in datasets
+                for d in client.list_datasets(page_size=LIST_PAGE_SIZE)
             ]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing datasets: {str(e)}")
 
 @router.get("/bigquery/tables")
-async def list_tables(
+def list_tables(
     project_id: str,
     dataset_id: str,
     token: Optional[str] = Depends(get_current_user_token)
@@ -59,23 +117,126 @@ async def list_tables(
             raise HTTPException(status_code=500, detail="Failed to initialize BigQuery client")
             
         dataset_ref = client.dataset(dataset_id, project=project_id)
-        tables = list(client.list_tables(dataset_ref))
-        
         return {
             "tables": [
                 {
                     "table_id": t.table_id,
                     "table_type": t.table_type,
                     "full_table_id": t.full_table_id,
-                    "created": t.created.isoformat() if t.created else None,
-                    "expires": t.expires.isoformat() if t.expires else None
+                    "created": t.created,
+                    "expires": t.expires
                 }
-                for t in tables
+                for t in client.list_tables(dataset_ref, page_size=LIST_PAGE_SIZE)
             ]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing tables: {str(e)}")
 
+def _scan_dataset(client, project_id: str, dataset_id: str) -> List[dict]:
+    """Return the Iceberg tables found in a single dataset (blocking)."""
+    found_tables = []
+    dataset_ref = client.dataset(dataset_id, project=project_id)
+    # Use iterator to handle potential partial results or specific iteration errors
+    tables = client.list_tables(dataset_ref, page_size=LIST_PAGE_SIZE)
+
+    for table_item in tables:
+        try:
+            if table_item.table_type == 'EXTERNAL':
+                # Fetch full table details to check external configuration
+                table = client.get_table(table_item.reference)
+                ext_config = table.external_data_configuration
+                
+                # Robustly check for source_format and source_uris
+                source_format = None
+                source_uris = []
+                
+                if ext_config:
+                    # Handle both object and dict-like access for safety
+                    if hasattr(ext_config, 'source_format'):
+                        source_format = ext_config.source_format
+                    elif isinstance(ext_config, dict):
+                        source_format = ext_config.get('source_format')
+                        
+                    if hasattr(ext_config, 'source_uris'):
+                        source_uris = ext_config.source_uris
+                    elif isinstance(ext_config, dict):
+                        source_uris = ext_config.get('source_uris', [])
+
+                if source_format == 'ICEBERG':
+                    found_tables.append({
+                        "dataset_id": dataset_id,
+                        "table_id": table.table_id,
+                        "full_table_id": f"{project_id}.{dataset_id}.{table.table_id}",
+                        "location": source_uris[0] if source_uris else None,
+                        "created": table.created
+                    })
+        except Exception as e:
+            # Log error but continue scanning other tables
+            print(f"Warning: Error inspecting table {table_item.table_id}: {e}")
+            continue
+
+    return found_tables
+
+def _dataset_regions(datasets) -> Optional[Set[str]]:
+    """Return the regions holding the given datasets, or None if any is unknown."""
+    regions = set()
+    for dataset in datasets:
+        # datasets.list already returns each dataset's location; it is just not exposed as a property
+        properties = getattr(dataset, "_properties", None)
+        location = properties.get("location") if isinstance(properties, dict) else None
+        if not isinstance(location, str) or not location:
+            return None
+        regions.add(location.lower())
+    return regions
+
+def _query_iceberg_tables(client, project_id: str, region: str) -> List[dict]:
+    """Return the Iceberg tables of one region from INFORMATION_SCHEMA (blocking)."""
+    sql = _ICEBERG_TABLES_QUERY.format(project=project_id, region=region)
+    found_tables = []
+    for row in client.query(sql).result(page_size=QUERY_RESULT_PAGE_SIZE):
+        try:
+            source_uris = orjson.loads(row.uris) if row.uris else []
+        except ValueError:
+            source_uris = []
+        found_tables.append({
+            "dataset_id": row.table_schema,
+            "table_id": row.table_name,
+            "full_table_id": f"{project_id}.{row.table_schema}.{row.table_name}",
+            "location": source_uris[0] if source_uris else None,
+            "created": row.creation_time
+        })
+    return found_tables
+
+async def _search_information_schema(client, project_id: str, regions: Set[str]) -> List[dict]:
+    """Find Iceberg tables with one INFORMATION_SCHEMA query per region."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_query_iceberg_tables, client, project_id, region) for region in sorted(regions))
+    )
+    return [table for region_tables in results for table in region_tables]
+
+async def _search_datasets(client, project_id: str, datasets) -> List[dict]:
+    """Find Iceberg tables by inspecting every external table of every dataset."""
+    # Scan datasets concurrently; the semaphore keeps us well under BigQuery's per-user API quota
+    semaphore = asyncio.Semaphore(SEARCH_DATASET_CONCURRENCY)
+
+    async def scan(dataset_id: str) -> List[dict]:
+        async with semaphore:
+            return await asyncio.to_thread(_scan_dataset, client, project_id, dataset_id)
+
+    results = await asyncio.gather(
+        *(scan(dataset.dataset_id) for dataset in datasets),
+        return_exceptions=True
+    )
+
+    found_tables = []
+    for dataset, result in zip(datasets, results):
+        if isinstance(result, BaseException):
+            # Log error but continue with other datasets
+            print(f"Warning: Error scanning dataset {dataset.dataset_id}: {result}")
+            continue
+        found_tables.extend(result)
+    return found_tables
+
 @router.get("/bigquery/search-iceberg")
 async def search_iceberg_tables(
     project_id: str,
@@ -83,59 +244,23 @@ async def search_iceberg_tables(
 ):
     """Search for Iceberg tables across all datasets in the project."""
     try:
-        client = get_bigquery_client(token=token, project_id=project_id)
+        client = await asyncio.to_thread(get_bigquery_client, token=token, project_id=project_id)
         if not client:
             raise HTTPException(status_code=500, detail="Failed to initialize BigQuery client")
 
-        found_tables = []
-        datasets = list(client.list_datasets())
+        datasets = await asyncio.to_thread(lambda: list(client.list_datasets(page_size=LIST_PAGE_SIZE)))
 
-        # TODO: Consider parallelizing this if performance becomes an issue
-        for dataset in datasets:
+        found_tables = None
+        regions = _dataset_regions(datasets)
+        if USE_INFORMATION_SCHEMA_SEARCH and regions is not None and _PROJECT_ID_RE.match(project_id):
             try:
-                dataset_ref = client.dataset(dataset.dataset_id, project=project_id)
-                # Use iterator to handle potential partial results or specific iteration errors
-                tables = client.list_tables(dataset_ref)
-                
-                for table_item in tables:
-                    try:
-                        if table_item.table_type == 'EXTERNAL':
-                            # Fetch full table details to check external configuration
-                            table = client.get_table(table_item.reference)
-                            ext_config = table.external_data_configuration
-                            
-                            # Robustly check for source_format and source_uris
-                            source_format = None
-                            source_uris = []
-                            
-                            if ext_config:
-                                # Handle both object and dict-like access for safety
-                                if hasattr(ext_config, 'source_format'):
-                                    source_format = ext_config.source_format
-                                elif isinstance(ext_config, dict):
-                                    source_format = ext_config.get('source_format')
-                                    
-                                if hasattr(ext_config, 'source_uris'):
-                                    source_uris = ext_config.source_uris
-                                elif isinstance(ext_config, dict):
-                                    source_uris = ext_config.get('source_uris', [])
-
-                            if source_format == 'ICEBERG':
-                                found_tables.append({
-                                    "dataset_id": dataset.dataset_id,
-                                    "table_id": table.table_id,
-                                    "full_table_id": f"{project_id}.{dataset.dataset_id}.{table.table_id}",
-                                    "location": source_uris[0] if source_uris else None,
-                                    "created": table.created.isoformat() if table.created else None
-                                })
-                    except Exception as e:
-                        # Log error but continue scanning other tables
-                        print(f"Warning: Error inspecting table {table_item.table_id}: {e}")
-                        continue
-            except Exception as e:
-                # Log error but continue scanning other datasets
-                print(f"Warning: Error scanning dataset {dataset.dataset_id}: {e}")
-                continue
+                found_tables = await _search_information_schema(client, project_id, regions)
+            except Forbidden as e:
+                # INFORMATION_SCHEMA needs project-level metadata permissions; inspect tables one by one instead
+                print(f"Warning: INFORMATION_SCHEMA not accessible, scanning datasets: {e}")
+
+        if found_tables is None:
+            found_tables = await _search_datasets(client, project_id, datasets)
 
         return {"tables": found_tables}
 
@@ -1,20 +1,100 @@
+import asyncio
+import functools
+import logging
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional, List, Dict, Any
-from google.cloud import storage
+from typing import Optional, Dict, Any
 from ..core.security import get_current_user_token
+from ..services.gcs import get_storage_client
+from ..services.listing_cache import cached_listing
 
 router = APIRouter()
 
-def get_storage_client(token: Optional[str] = None, project_id: Optional[str] = None):
-    try:
-        from google.oauth2.credentials import Credentials
-        if token:
-            creds = Credentials(token=token)
-            return storage.Client(credentials=creds, project=project_id)
-        return storage.Client(project=project_id)
-    except Exception as e:
-        print(f"Error creating storage client: {e}")
-        return None
+logger = logging.getLogger(__name__)
+
+# Objects requested per GCS list page; listings are streamed page by page rather than materialized
+LIST_PAGE_SIZE = 1000
+
+def _browse_bucket(client, bucket_obj, bucket: str, path: str, project_id: Optional[str]) -> Dict[str, Any]:
+    """List a bucket path, flagging folders that are Iceberg tables (blocking)."""
+    # Ensure path ends with / if not empty
+    prefix = path
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+
+    # Stream the listing page by page, turning files into items as they arrive;
+    # consuming the iterator also populates its prefixes attribute
+    blobs_iterator = client.list_blobs(bucket_obj, prefix=prefix, delimiter="/", page_size=LIST_PAGE_SIZE)
+    file_items = []
+    for blob in blobs_iterator:
+        if blob.name == prefix:
+            continue
+        name = blob.name.split("/")[-1]
+        if not name:
+            continue
+
+        file_items.append({
+            "name": name,
+            "type": "file",
+            "path": blob.name,
+            "size": blob.size,
+            "contentType": blob.content_type,
+            "timeCreated": blob.time_created
+        })
+
+    folders = sorted(blobs_iterator.prefixes) if blobs_iterator.prefixes else []
+    items = []
+
+    # Find Iceberg tables (folders with metadata/*.metadata.json) in a single listing instead of
+    # probing each folder's metadata/ prefix separately; GCS applies the glob server-side, so only
+    # the metadata files of direct child folders are transferred, not every object of the subtree
+    table_folders = set()
+    if folders:
+        try:
+            metadata_blobs = client.list_blobs(
+                bucket_obj,
+                prefix=prefix,
+                match_glob=f"{prefix}*/metadata/*.metadata.json",
+                fields="items(name),nextPageToken",
+                page_size=LIST_PAGE_SIZE,
+            )
+            for blob in metadata_blobs:
+                table_folders.add(blob.name[len(prefix):].partition("/")[0])
+        except Exception:
+            # Tables are then shown as plain folders; make that visible
+            logger.warning("Could not detect Iceberg tables under gs://%s/%s", bucket, prefix, exc_info=True)
+
+    # Process folders (prefixes)
+    for folder in folders:
+        folder_name = folder.rstrip("/").split("/")[-1]
+        full_path = folder.rstrip("/")
+
+        # Check if it's an Iceberg table (has metadata folder)
+        is_iceberg = folder[len(prefix):].rstrip("/") in table_folders
+
+        item = {
+            "name": folder_name,
+            "type": "iceberg_table" if is_iceberg else "folder",
+            "path": full_path
+        }
+
+        if is_iceberg:
+            item["table"] = {
+                "name": folder_name,
+                "location": f"gs://{bucket}/{full_path}",
+                "bucket": bucket,
+                "path": full_path,
+                "projectId": project_id
+            }
+
+        items.append(item)
+
+    # Files follow the folders
+    items.extend(file_items)
+
+    return {
+        "folders": [f.rstrip("/").split("/")[-1] for f in folders],
+        "items": items
+    }
 
 @router.get("/browse")
 async def browse_bucket(
@@ -25,75 +105,16 @@ async def browse_bucket(
 ):
     """List contents of a GCS bucket path."""
     try:
-        client = get_storage_client(token=token, project_id=project_id)
+        client = await asyncio.to_thread(get_storage_client, token=token, project_id=project_id)
         if not client:
             raise HTTPException(status_code=500, detail="Failed to initialize storage client")
 
         bucket_obj = client.bucket(bucket)
         
-        # Ensure path ends with / if not empty
-        prefix = path
-        if prefix and not prefix.endswith("/"):
-            prefix += "/"
-            
-        blobs = list(client.list_blobs(bucket_obj, prefix=prefix, delimiter="/"))
-        
-        folders = list(blobs.prefixes) if blobs.prefixes else []
-        items = []
-        
-        # Process folders (prefixes)
-        for folder in folders:
-            folder_name = folder.rstrip("/").split("/")[-1]
-            full_path = folder.rstrip("/")
-            
-            # Check if it's an Iceberg table (has metadata folder)
-            is_iceberg = False
-            try:
-                metadata_prefix = f"{folder}metadata/"
-                metadata_blobs = list(client.list_blobs(bucket_obj, prefix=metadata_prefix, max_results=1))
-                if metadata_blobs:
-                    is_iceberg = True
-            except:
-                pass
-
-            item = {
-                "name": folder_name,
-                "type": "iceberg_table" if is_iceberg else "folder",
-                "path": full_path
-            }
-            
-            if is_iceberg:
-                item["table"] = {
-                    "name": folder_name,
-                    "location": f"gs://{bucket}/{full_path}",
-                    "bucket": bucket,
-                    "path": full_path,
-                    "projectId": project_id
-                }
-            
-            items.append(item)
-
-        # Process files (blobs)
-        for blob in blobs:
-            if blob.name == prefix:
-                continue
-            name = blob.name.split("/")[-1]
-            if not name:
-                continue
-                
-            items.append({
-                "name": name,
-                "type": "file",
-                "path": blob.name,
-                "size": blob.size,
-                "contentType": blob.content_type,
-                "timeCreated": blob.time_created.isoformat() if blob.time_created else None
-            })
-
-        return {
-            "folders": [f.rstrip("/").split("/")[-1] for f in folders],
-            "items": items
-        }
+        return await cached_listing(
+            "browse", bucket, path, project_id, token,
+            functools.partial(_browse_bucket, client, bucket_obj, bucket, path, project_id),
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error browsing bucket: {str(e)}")
@@ -1,19 +1,135 @@
-from fastapi import APIRouter, HTTPException, Depends, Security
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import ORJSONResponse, Response
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import logging
 import os
+import threading
+import time
+import orjson
+from cachetools import TTLCache
 from google.cloud import resourcemanager_v3
-from ..core.security import get_current_user_token
+from google.cloud.resourcemanager_v3 import Project
+from ..core.http import etag_matches
+from ..core.security import get_current_user_token, token_digest
 from ..services.gcs import get_resource_manager_client, get_storage_client
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Accessible projects change on the order of hours; repeat requests are served from memory.
+# Entries older than PROJECTS_CACHE_FRESH_SECONDS are still served but refreshed in the background;
+# only entries past PROJECTS_CACHE_TTL_SECONDS make a request wait for Resource Manager.
+PROJECTS_CACHE_FRESH_SECONDS = 30
+PROJECTS_CACHE_TTL_SECONDS = 300
+_projects_cache = TTLCache(maxsize=256, ttl=PROJECTS_CACHE_TTL_SECONDS)
+_projects_cache_lock = threading.Lock()
+_projects_refreshing = set()
+_refresh_tasks = set()
+
+# Largest page Resource Manager serves; the default (~100) means many more round-trips on big accounts
+PROJECTS_PAGE_SIZE = 1000
+
+# Project lifecycle state names by enum value
+_STATE_NAMES = {state.value: state.name for state in Project.State}
+
+# Upper bound on the gcloud CLI fallback
+GCLOUD_TIMEOUT_SECONDS = 10
+GCLOUD_PROJECTS_LIMIT = 500
+GCLOUD_CACHE_TTL_SECONDS = 300
+_gcloud_cache = TTLCache(maxsize=1, ttl=GCLOUD_CACHE_TTL_SECONDS)
+
+# Cap concurrent outbound calls so bursts of users stay under the Resource Manager quota;
+# gcloud gets a single slot since parallel invocations only contend for the same config
+RM_MAX_CONCURRENCY = int(os.getenv("RM_MAX_CONCURRENCY", "8"))
+GCLOUD_MAX_CONCURRENCY = 1
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    """Return the named semaphore, created on first use inside the running event loop"""
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        semaphore = _semaphores[name] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _projects_cache_key(token: Optional[str]):
+    """Identify the caller's credentials without keeping the raw token"""
+    if token:
+        return ("token", token_digest(token))
+    return ("default", os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or "adc")
+
 
 @router.get("/projects")
-async def list_projects(token: Optional[str] = Depends(get_current_user_token)):
-    """List all GCP projects accessible with current credentials"""
-    projects = []
-    errors = []
-    
-    # Try Resource Manager API first
+async def list_projects(
+    token: Optional[str] = Depends(get_current_user_token),
+    if_none_match: Optional[str] = Header(None),
+):
+    """List all GCP projects accessible with current credentials
+
+    Responses carry an ETag; a client that already holds the cached listing
+    gets a 304 without any Google API calls.
+    """
+    cache_key = _projects_cache_key(token)
+    with _projects_cache_lock:
+        cached = _projects_cache.get(cache_key)
+    if cached is None:
+        _, etag, result = await _refresh_projects(cache_key, token)
+    else:
+        fetched_at, etag, result = cached
+        if time.monotonic() - fetched_at > PROJECTS_CACHE_FRESH_SECONDS and cache_key not in _projects_refreshing:
+            # Serve the stale listing now; at most one refresh per key runs behind it
+            _projects_refreshing.add(cache_key)
+            task = asyncio.create_task(_background_refresh(cache_key, token))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(result, headers=headers)
+
+
+async def _refresh_projects(cache_key, token: Optional[str]):
+    """List projects and store them with their ETag under cache_key"""
+    result = await _list_projects(token)
+    etag = f'"{hashlib.blake2b(orjson.dumps(result), digest_size=16).hexdigest()}"'
+    entry = (time.monotonic(), etag, result)
+    with _projects_cache_lock:
+        _projects_cache[cache_key] = entry
+    return entry
+
+
+async def _background_refresh(cache_key, token: Optional[str]):
+    """Refresh a stale cache entry, keeping the old one if the refresh fails"""
+    try:
+        await _refresh_projects(cache_key, token)
+    except Exception:
+        logger.warning("Background project refresh failed", exc_info=True)
+    finally:
+        _projects_refreshing.discard(cache_key)
+
+
+def _project_entry(project) -> Dict[str, Any]:
+    """Convert a Resource Manager project into the response shape"""
+    project_id = project.project_id
+    return {
+        "id": project_id,
+        "name": project.display_name or project_id,
+        # State enums are ints, so one dict lookup covers members and raw values
+        "state": _STATE_NAMES.get(getattr(project, "state", None), "UNKNOWN"),
+    }
+
+
+def _from_resource_manager(
+    token: Optional[str],
+    projects: List[Dict[str, Any]],
+    active_projects: List[Dict[str, Any]],
+    errors: List[str],
+):
+    """List projects through the Resource Manager API into projects/active_projects (blocking)"""
     try:
         client = get_resource_manager_client(token=token)
         if client is not None:
@@ -21,12 +137,12 @@ async def list_projects(token: Optional[str] = Depends(get_current_user_token)):
             # search_projects can list all accessible projects without requiring a parent
             try:
                 # Try search_projects first (doesn't require parent)
-                request = resourcemanager_v3.SearchProjectsRequest(query="")
+                request = resourcemanager_v3.SearchProjectsRequest(query="", page_size=PROJECTS_PAGE_SIZE)
                 page_result = client.search_projects(request=request)
             except Exception as search_error:
                 # If search_projects fails, try list_projects with organizations/-
                 try:
-                    request = resourcemanager_v3.ListProjectsRequest(parent="organizations/-")
+                    request = resourcemanager_v3.ListProjectsRequest(parent="organizations/-", page_size=PROJECTS_PAGE_SIZE)
                     page_result = client.list_projects(request=request)
                 except Exception:
                     # If both fail, raise the original search error
@@ -34,114 +150,149 @@ async def list_projects(token: Optional[str] = Depends(get_current_user_token)):
             
             for project in page_result:
                 try:
-                    project_state = "UNKNOWN"
-                    if hasattr(project, 'state'):
-                        if hasattr(project.state, 'name'):
-                            project_state = project.state.name
-                        elif isinstance(project.state, int):
-                            # State is an enum value
-                            from google.cloud.resourcemanager_v3 import Project
-                            try:
-                                project_state = Project.State(project.state).name
-                            except:
-                                project_state = str(project.state)
-                    
-                    projects.append({
-                        "id": project.project_id,
-                        "name": project.display_name or project.project_id,
-                        "state": project_state,
-                    })
+                    entry = _project_entry(project)
+                    # Split out active projects in the same pass; both lists share the entry
+                    projects.append(entry)
+                    if entry["state"] == "ACTIVE":
+                        active_projects.append(entry)
                 except Exception as e:
                     errors.append(f"Error processing project: {str(e)}")
                     continue
-            
-            # Return active projects first, but include all if requested
-            if projects:
-                # Filter to active projects for display
-                active_projects = [p for p in projects if p.get("state") == "ACTIVE"]
-                if active_projects:
-                    return {
-                        "projects": active_projects,
-                        "total_found": len(projects),
-                        "active_count": len(active_projects),
-                        "errors": errors if errors else None
-                    }
-                # If no active projects, return all projects
-                return {
-                    "projects": projects,
-                    "total_found": len(projects),
-                    "active_count": 0,
-                    "errors": errors if errors else None
-                }
-    except Exception as e:
-        error_msg = f"Resource Manager API error: {str(e)}"
-        errors.append(error_msg)
-        print(error_msg)
-        import traceback
-        print(traceback.format_exc())
-    
-    # Try using gcloud CLI as fallback
-    try:
-        import subprocess
-        result = subprocess.run(
-            ["gcloud", "projects", "list", "--format=json"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        if result.returncode == 0 and result.stdout:
-            import json as json_lib
-            gcloud_projects = json_lib.loads(result.stdout)
-            for proj in gcloud_projects:
-                project_id = proj.get("projectId") or proj.get("project_id")
-                if project_id and not any(p["id"] == project_id for p in projects):
-                    projects.append({
-                        "id": project_id,
-                        "name": proj.get("name", project_id),
-                        "state": "ACTIVE" if proj.get("lifecycleState") == "ACTIVE" else "UNKNOWN",
-                    })
     except Exception as e:
-        # gcloud not available or failed, continue
-        pass
-    
-    # Fallback: Try to get project from service account JSON file
-    try:
-        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        if credentials_path and os.path.exists(credentials_path):
-            import json as json_lib
-            with open(credentials_path, 'r') as f:
-                creds_data = json_lib.load(f)
-                project_id = creds_data.get("project_id")
-                if project_id and not any(p["id"] == project_id for p in projects):
-                    projects.append({
-                        "id": project_id,
-                        "name": project_id,
-                        "state": "UNKNOWN",
-                    })
-    except Exception:
-        pass
-    
-    # Fallback: Try to get project from default storage client
+        errors.append(f"Resource Manager API error: {str(e)}")
+        logger.debug("Resource Manager API error", exc_info=True)
+
+
+async def _from_gcloud_cli() -> List[Dict[str, Any]]:
+    """List projects with the gcloud CLI, reusing its output for GCLOUD_CACHE_TTL_SECONDS
+
+    Spawning gcloud costs the better part of a second, and its account does not
+    depend on the request, so one cached listing serves every caller.
+    """
+    cached = _gcloud_cache.get("projects")
+    if cached is not None:
+        return cached
+    async with _semaphore("gcloud", GCLOUD_MAX_CONCURRENCY):
+        # Another request may have filled the cache while this one waited
+        cached = _gcloud_cache.get("projects")
+        if cached is not None:
+            return cached
+        try:
+            projects = await _run_gcloud_projects_list()
+        except Exception:
+            # gcloud not available or hung; remember that too instead of retrying on every request
+            projects = []
+        _gcloud_cache["projects"] = projects
+        return projects
+
+
+async def _run_gcloud_projects_list() -> List[Dict[str, Any]]:
+    """Run gcloud projects list without blocking the event loop"""
+    process = await asyncio.create_subprocess_exec(
+        "gcloud", "projects", "list", "--format=json", f"--limit={GCLOUD_PROJECTS_LIMIT}",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
     try:
-        storage_client = get_storage_client(token=token)
-        default_project = storage_client.project
-        if default_project and not any(p["id"] == default_project for p in projects):
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=GCLOUD_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0 or not stdout:
+        return []
+
+    projects = []
+    # orjson decodes the raw stdout bytes directly
+    for proj in orjson.loads(stdout):
+        project_id = proj.get("projectId") or proj.get("project_id")
+        if project_id:
             projects.append({
-                "id": default_project,
-                "name": default_project,
-                "state": "UNKNOWN",
+                "id": project_id,
+                "name": proj.get("name", project_id),
+                "state": "ACTIVE" if proj.get("lifecycleState") == "ACTIVE" else "UNKNOWN",
             })
-    except Exception:
-        pass
+    return projects
+
+
+def _from_service_account_file() -> List[Dict[str, Any]]:
+    """Read the project from the service account JSON file, if one is configured (blocking)"""
+    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if credentials_path and os.path.exists(credentials_path):
+        with open(credentials_path, 'rb') as f:
+            creds_data = orjson.loads(f.read())
+        project_id = creds_data.get("project_id")
+        if project_id:
+            return [{"id": project_id, "name": project_id, "state": "UNKNOWN"}]
+    return []
+
+
+def _from_storage_default(token: Optional[str]) -> List[Dict[str, Any]]:
+    """Use the default project of the storage client (blocking)"""
+    storage_client = get_storage_client(token=token)
+    default_project = storage_client.project
+    if default_project:
+        return [{"id": default_project, "name": default_project, "state": "UNKNOWN"}]
+    return []
+
+
+def _sufficient(projects: List[Dict[str, Any]]) -> bool:
+    """Whether a source found enough to skip the remaining fallbacks
+
+    Any listed project counts, active or not: the fallbacks only ever report the
+    credentials' own default project, which Resource Manager already covers.
+    """
+    return bool(projects)
+
+
+def _projects_response(
+    projects: List[Dict[str, Any]],
+    active_projects: List[Dict[str, Any]],
+    errors: List[str],
+) -> Dict[str, Any]:
+    """Return active projects first, falling back to all projects when none are active"""
+    return {
+        "projects": active_projects if active_projects else projects,
+        "total_found": len(projects),
+        "active_count": len(active_projects),
+        "errors": errors if errors else None
+    }
+
+
+async def _list_projects(token: Optional[str]) -> Dict[str, Any]:
+    """Collect accessible projects from Resource Manager and the local fallbacks"""
+    projects = []
+    active_projects = []
+    errors = []
+    
+    # Try Resource Manager API first
+    async with _semaphore("resource_manager", RM_MAX_CONCURRENCY):
+        await asyncio.to_thread(_from_resource_manager, token, projects, active_projects, errors)
+    if _sufficient(projects):
+        return _projects_response(projects, active_projects, errors)
+    
+    # Resource Manager found nothing: query the gcloud CLI, the service account file and the
+    # default storage project concurrently, so the fallbacks cost the slowest one, not their sum
+    fallback_results = await asyncio.gather(
+        _from_gcloud_cli(),
+        asyncio.to_thread(_from_service_account_file),
+        asyncio.to_thread(_from_storage_default, token),
+        return_exceptions=True,
+    )
+    seen_ids = {p["id"] for p in projects}
+    for result in fallback_results:
+        if isinstance(result, BaseException):
+            # Fallback not available or failed, continue
+            continue
+        for candidate in result:
+            if candidate["id"] not in seen_ids:
+                seen_ids.add(candidate["id"])
+                projects.append(candidate)
+                if candidate["state"] == "ACTIVE":
+                    active_projects.append(candidate)
     
     if projects:
-        active_projects = [p for p in projects if p.get("state") == "ACTIVE"]
-        return {
-            "projects": active_projects if active_projects else projects,
-            "total_found": len(projects),
-            "active_count": len(active_projects),
-            "errors": errors if errors else None
-        }
+        return _projects_response(projects, active_projects, errors)
     
     # If still no projects, return empty list with helpful message
     error_detail = "No projects found. "
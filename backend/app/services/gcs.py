@@ -1,7 +1,29 @@
-from typing import Optional
+from typing import Any, Callable, Hashable, Optional, Tuple
 import os
+import threading
+import requests
+from cachetools import LRUCache
 from google.cloud import storage
 from google.cloud import resourcemanager_v3
+from google.oauth2 import service_account
+from ..core.security import token_digest
+
+# Connections kept per host by each storage client; must cover the widest parallel fan-out
+GCS_POOL_SIZE = int(os.getenv("GCS_POOL_SIZE", "50"))
+
+# Clients are cached per credentials; keys carry a digest of the bearer token, never the token itself
+CLIENT_CACHE_SIZE = 64
+_storage_clients: LRUCache = LRUCache(maxsize=CLIENT_CACHE_SIZE)
+_resource_manager_clients: LRUCache = LRUCache(maxsize=CLIENT_CACHE_SIZE)
+_gcs_filesystems: LRUCache = LRUCache(maxsize=CLIENT_CACHE_SIZE)
+_clients_lock = threading.Lock()
+
+# Keep the Resource Manager gRPC channel warm between requests
+_RM_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
 
 def get_storage_client(project_id: Optional[str] = None, token: Optional[str] = None):
     """Get GCS storage client with credentials
@@ -10,7 +32,62 @@ def get_storage_client(project_id: Optional[str] = None, token: Optional[str] =
     1. Bearer Token (if provided) -> User-Centric
     2. GOOGLE_APPLICATION_CREDENTIALS environment variable
     3. Application Default Credentials (ADC)
+
+    Clients are reused across requests for the same credentials, which keeps
+    their HTTP sessions (and pooled TLS connections) alive between calls.
+    """
+    credentials_path, credentials_mtime = _credentials_file()
+    return _cached_client(
+        _storage_clients,
+        (project_id, token_digest(token), credentials_path, credentials_mtime),
+        lambda: _with_connection_pool(_build_storage_client(project_id, token, credentials_path)),
+    )
+
+
+def _cached_client(cache: LRUCache, key: Tuple[Hashable, ...], build: Callable[[], Any]):
+    """Return the client cached under key, building it on a miss (build errors are not cached)"""
+    with _clients_lock:
+        client = cache.get(key)
+    if client is None:
+        client = build()
+        with _clients_lock:
+            # Another thread may have built one meanwhile; keep a single client per key
+            client = cache.setdefault(key, client)
+    return client
+
+
+def _credentials_file() -> Tuple[Optional[str], float]:
+    """Return the configured service account file and its mtime (so a rotated key is reloaded)"""
+    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if not credentials_path or not os.path.exists(credentials_path):
+        return None, 0.0
+    try:
+        return credentials_path, os.path.getmtime(credentials_path)
+    except OSError:
+        return credentials_path, 0.0
+
+
+def clear_clients():
+    """Drop all cached clients (used by tests and after credential changes)"""
+    with _clients_lock:
+        _storage_clients.clear()
+        _resource_manager_clients.clear()
+        _gcs_filesystems.clear()
+
+
+def _with_connection_pool(client):
+    """Size the client's HTTP connection pool for our parallel manifest and listing fan-outs
+
+    requests keeps only 10 connections per host by default, so concurrent calls
+    beyond that discard and re-open TLS connections.
     """
+    adapter = requests.adapters.HTTPAdapter(pool_connections=GCS_POOL_SIZE, pool_maxsize=GCS_POOL_SIZE)
+    client._http.mount("https://", adapter)
+    client._http.mount("http://", adapter)
+    return client
+
+
+def _build_storage_client(project_id: Optional[str], token: Optional[str], credentials_path: Optional[str]):
     # 1. Try Bearer Token (User-Centric)
     if token:
         try:
@@ -24,8 +101,7 @@ def get_storage_client(project_id: Optional[str] = None, token: Optional[str] =
             pass
 
     # 2. Try environment variable
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if credentials_path and os.path.exists(credentials_path):
+    if credentials_path:
         if project_id:
             return storage.Client.from_service_account_json(credentials_path, project=project_id)
         return storage.Client.from_service_account_json(credentials_path)
@@ -36,28 +112,66 @@ def get_storage_client(project_id: Optional[str] = None, token: Optional[str] =
     return storage.Client()
 
 
+def get_gcs_filesystem(project_id: Optional[str] = None, token: Optional[str] = None):
+    """Get a gcsfs filesystem for partial object reads (requires gcsfs)
+
+    Filesystems are reused per credentials like storage clients, so their
+    auth and HTTP session setup only happens once.
+    """
+    # If token is not provided (using default creds), avoid passing project to prevent mismatch errors
+    fs_project = project_id if token else None
+    return _cached_client(_gcs_filesystems, (fs_project, token_digest(token)), lambda: _build_gcs_filesystem(fs_project, token))
+
+
+def _build_gcs_filesystem(project_id: Optional[str], token: Optional[str]):
+    import gcsfs
+    # Bypass fsspec's own unbounded instance cache (keyed on the raw token); ours is bounded and cleared with the clients
+    return gcsfs.GCSFileSystem(project=project_id, token=token if token else 'google_default', skip_instance_cache=True)
+
+
 def get_resource_manager_client(token: Optional[str] = None):
-    """Get Resource Manager client for listing projects"""
+    """Get Resource Manager client for listing projects
+
+    Clients are cached per credentials like storage clients. Without a token,
+    None is returned (and not cached) when no client can be built; with a
+    token, the error is raised so the caller can report it.
+    """
+    credentials_path, credentials_mtime = _credentials_file()
     try:
-        # 1. Try Bearer Token (User-Centric)
-        if token:
-            try:
-                from google.oauth2.credentials import Credentials
-                creds = Credentials(token=token)
-                return resourcemanager_v3.ProjectsClient(credentials=creds)
-            except Exception as e:
-                print(f"Error creating RM client from token: {e}")
-                pass
-
-        # 2. Try environment variable
-        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        if credentials_path and os.path.exists(credentials_path):
-            from google.oauth2 import service_account
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            return resourcemanager_v3.ProjectsClient(credentials=credentials)
-            
-        # 3. Use Application Default Credentials (ADC)
-        return resourcemanager_v3.ProjectsClient()
+        return _cached_client(
+            _resource_manager_clients,
+            (token_digest(token), credentials_path, credentials_mtime),
+            lambda: _build_resource_manager_client(token, credentials_path),
+        )
     except Exception:
+        if token:
+            # A user's token must not silently fall back to the server's credentials; report the failure
+            raise
         # If Resource Manager API is not available, return None
         return None
+
+
+def _build_resource_manager_client(token: Optional[str], credentials_path: Optional[str]):
+    # 1. Bearer Token (User-Centric)
+    if token:
+        from google.oauth2.credentials import Credentials
+        return _projects_client(Credentials(token=token))
+
+    # 2. Try environment variable
+    if credentials_path:
+        credentials = service_account.Credentials.from_service_account_file(credentials_path)
+        return _projects_client(credentials)
+        
+    # 3. Use Application Default Credentials (ADC)
+    return _projects_client()
+
+
+def _projects_client(credentials=None):
+    """Build a ProjectsClient on its own gRPC channel with keepalive enabled
+
+    The client is cached, so the HTTP/2 channel (and its connection) is reused
+    across requests; keepalive pings stop idle connections from being dropped.
+    """
+    transport_class = resourcemanager_v3.ProjectsClient.get_transport_class("grpc")
+    channel = transport_class.create_channel(credentials=credentials, options=_RM_CHANNEL_OPTIONS)
+    return resourcemanager_v3.ProjectsClient(transport=transport_class(channel=channel))
@@ -1,7 +1,26 @@
 from typing import List, Dict, Any, Optional, Tuple
-import json
+import logging
+import re
+import threading
+import time
+import warnings
+from io import BytesIO
+import orjson
+from collections import Counter, deque, namedtuple
 from datetime import datetime
-from .gcs import get_storage_client
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from cachetools import LRUCache, TTLCache
+from .gcs import get_gcs_filesystem, get_storage_client
+from ..core.security import token_digest
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent manifest downloads per manifest list
+MANIFEST_FETCH_WORKERS = 16
+
+# Snapshots whose manifest lists are read concurrently; each one fans out to its own manifest pool
+SNAPSHOT_FETCH_WORKERS = 8
 
 # Try to import PyIceberg for proper metadata parsing
 try:
@@ -16,6 +35,20 @@ except ImportError as e:
     PYICEBERG_AVAILABLE = False
     print(f"Warning: PyIceberg not available: {e}. Using manual metadata parsing.")
 
+# Sample data readers: pandas for the row conversion, gcsfs + pyarrow for partial Parquet reads
+# (without gcsfs, samples fall back to downloading the whole file)
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+try:
+    import gcsfs
+    import pyarrow.parquet as pq
+    # gcsfs warns about the GCS project on every filesystem it creates
+    warnings.filterwarnings("ignore", category=UserWarning, module="gcsfs")
+except ImportError:
+    gcsfs = None
+
 # Check for fastavro availability
 try:
     import fastavro
@@ -26,6 +59,109 @@ except ImportError:
     print("Warning: fastavro not available. Avro manifest files cannot be parsed.")
 
 
+def _download_blob(blob) -> bytes:
+    """Download a small metadata object in a single media GET
+
+    download_as_bytes never fetches object metadata first; the only extra work is
+    hashing the payload for the MD5 check, which Avro sync markers make redundant here.
+    """
+    return blob.download_as_bytes(checksum=None)
+
+
+def _read_avro(data: bytes):
+    """Iterate the records of an Avro container file (manifest lists and manifests)
+
+    All Iceberg Avro reads go through here so the decode setup lives in one place;
+    the reader takes its schema from the file header. Only the header is decoded
+    here: records are decoded lazily, so a corrupt data block raises while the
+    result is being iterated, not from this call.
+    """
+    return fastavro.reader(BytesIO(data))
+
+
+# Field names seen for each data file attribute, in order of preference (spec snake_case first)
+_MANIFEST_FIELD_CANDIDATES = {
+    "file_path": ("file_path", "filePath", "path", "content_path", "contentPath"),
+    "file_format": ("file_format", "fileFormat", "format"),
+    "partition": ("partition", "partition_data", "partitionData"),
+    "record_count": ("record_count", "recordCount", "num_rows", "numRows"),
+    "file_size": ("file_size_in_bytes", "fileSizeInBytes", "file_size", "fileSize", "length"),
+    "column_sizes": ("column_sizes", "columnSizes"),
+    "value_counts": ("value_counts", "valueCounts"),
+    "null_value_counts": ("null_value_counts", "nullValueCounts"),
+}
+
+# Resolved key per attribute for one manifest; None where the manifest has no such field
+_ManifestFields = namedtuple("_ManifestFields", ("data_file",) + tuple(_MANIFEST_FIELD_CANDIDATES))
+
+
+def _manifest_fields(entry: Any) -> Optional[_ManifestFields]:
+    """Work out which key names a manifest uses from one of its entries
+
+    Entries of a manifest share a schema, so this runs once per manifest instead of
+    probing every naming variant on every entry.
+    """
+    if not isinstance(entry, dict):
+        return None
+    # Avro format: data_file field contains the file info, otherwise the entry itself is the data file
+    data_file_key = next((key for key in ("data_file", "dataFile") if isinstance(entry.get(key), dict)), None)
+    data_file = entry[data_file_key] if data_file_key else entry
+    return _ManifestFields(data_file_key, *(
+        next((key for key in candidates if key in data_file), None)
+        for candidates in _MANIFEST_FIELD_CANDIDATES.values()
+    ))
+
+
+def _manifest_data_file(entry: Any, fields: Optional[_ManifestFields] = None) -> Optional[Dict[str, Any]]:
+    """Extract the data file summary from one manifest entry, or None if it has no file path"""
+    if fields is None:
+        fields = _manifest_fields(entry)
+    if fields is None or not isinstance(entry, dict):
+        return None
+
+    # dict.get(None) is simply None, so fields a manifest lacks need no special casing
+    data_file = entry.get(fields.data_file) if fields.data_file else entry
+    if not isinstance(data_file, dict):
+        return None
+
+    file_path = data_file.get(fields.file_path)
+    if not file_path:
+        return None
+
+    # Serialize partition to handle datetime objects; unpartitioned tables have nothing to convert
+    partition = {}
+    partition_data = data_file.get(fields.partition)
+    if partition_data and isinstance(partition_data, dict):
+        partition = {
+            key: value.isoformat() if hasattr(value, 'isoformat') else value  # datetime-like objects
+            for key, value in partition_data.items()
+        }
+
+    record_count = data_file.get(fields.record_count)
+    file_size = data_file.get(fields.file_size)
+
+    return {
+        "filePath": file_path,
+        "fileFormat": data_file.get(fields.file_format) or "parquet",
+        "partition": partition,
+        "recordCount": int(record_count) if record_count else 0,
+        "fileSizeInBytes": int(file_size) if file_size else 0,
+        "columnSizes": data_file.get(fields.column_sizes) or {},
+        "valueCounts": data_file.get(fields.value_counts) or {},
+        "nullValueCounts": data_file.get(fields.null_value_counts) or {},
+    }
+
+
+_get_record_count = itemgetter("recordCount")
+_get_file_size = itemgetter("fileSizeInBytes")
+
+
+def _file_totals(files: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Total record count and size in bytes of data files from get_manifest_files"""
+    # map + itemgetter keep both sums in C; every file dict carries both keys
+    return sum(map(_get_record_count, files)), sum(map(_get_file_size, files))
+
+
 def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_id: Optional[str] = None, token: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get data files from manifest list using PyIceberg or fastavro for Avro parsing"""
     try:
@@ -44,24 +180,20 @@ def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_
         # Use fastavro for Avro parsing (PyIceberg AvroFile is not available in this version)
         # fastavro is working well and is the preferred method
         if manifest_list_data is None and FASTAVRO_AVAILABLE:
+            manifest_list_bytes = None
             try:
-                from io import BytesIO
-                
-                manifest_bytes = manifest_list_blob.download_as_bytes()
-                
-                # fastavro.reader can read Avro files with embedded schema
-                # Need to seek to beginning
-                manifest_bytes_io = BytesIO(manifest_bytes)
-                manifest_bytes_io.seek(0)
-                manifest_list_data = list(fastavro.reader(manifest_bytes_io))
+                manifest_list_bytes = _download_blob(manifest_list_blob)
+                # Records are streamed from the decoder rather than materialized up front; this only
+                # catches header errors, block errors surface while the manifest paths are resolved below
+                manifest_list_data = _read_avro(manifest_list_bytes)
             except Exception as e:
                 print(f"fastavro parsing failed: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                # Try JSON as last resort
+                logger.debug("fastavro manifest list parsing failed", exc_info=True)
+                # Try JSON as last resort, parsing the bytes already downloaded if there are any
                 try:
-                    manifest_list_content = manifest_list_blob.download_as_text()
-                    manifest_list_data = json.loads(manifest_list_content)
+                    if manifest_list_bytes is None:
+                        manifest_list_bytes = manifest_list_blob.download_as_bytes()
+                    manifest_list_data = orjson.loads(manifest_list_bytes)
                 except Exception as json_err:
                     print(f"JSON fallback also failed: {json_err}")
                     return []
@@ -70,7 +202,7 @@ def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_
             print("Please install fastavro: pip install fastavro")
             return []
         
-        if manifest_list_data is None or (isinstance(manifest_list_data, list) and len(manifest_list_data) == 0):
+        if manifest_list_data is None:
             return []
         
         data_files = []
@@ -78,69 +210,83 @@ def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_
         # Process manifest list - it's an Avro file with manifest entries
         # Each entry has a manifest_path pointing to a manifest file
         # Iceberg manifest list format: list of dicts with "manifest_path" field
-        manifests = []
-        if isinstance(manifest_list_data, list):
-            manifests = manifest_list_data
-        elif isinstance(manifest_list_data, dict):
+        manifests = manifest_list_data
+        if isinstance(manifest_list_data, dict):
             # Could be a single entry or wrapped
             if "manifests" in manifest_list_data:
                 manifests = manifest_list_data["manifests"]
             else:
                 manifests = [manifest_list_data]
         
-        for idx, manifest_entry in enumerate(manifests):
-            # Handle different manifest entry formats
-            manifest_path = None
-            if isinstance(manifest_entry, str):
-                manifest_path = manifest_entry
-            elif isinstance(manifest_entry, dict):
-                # Try various field names for manifest path
-                manifest_path = (
-                    manifest_entry.get("manifest_path") or
-                    manifest_entry.get("manifestPath") or
-                    manifest_entry.get("path") or
-                    manifest_entry.get("file_path") or
-                    manifest_entry.get("filePath")
-                )
-            
-            if not manifest_path:
-                continue
+        # Resolve manifest paths first so the manifests can be downloaded concurrently
+        manifest_paths = []
+        try:
+            for manifest_entry in manifests:
+                # Handle different manifest entry formats
+                manifest_path = None
+                if isinstance(manifest_entry, str):
+                    manifest_path = manifest_entry
+                elif isinstance(manifest_entry, dict):
+                    # Try various field names for manifest path
+                    manifest_path = (
+                        manifest_entry.get("manifest_path") or
+                        manifest_entry.get("manifestPath") or
+                        manifest_entry.get("path") or
+                        manifest_entry.get("file_path") or
+                        manifest_entry.get("filePath")
+                    )
                 
-            manifest_path_clean = manifest_path.replace(f"gs://{bucket}/", "").lstrip("/")
+                if not manifest_path:
+                    continue
+
+                manifest_paths.append(manifest_path)
+        except Exception:
+            # A corrupt Avro block of the manifest list is only hit while iterating its records
+            logger.warning("fastavro manifest list parsing failed for %s", manifest_path_clean, exc_info=True)
+            return []
+
+        def fetch_manifest(manifest_path: str):
+            """Download one manifest file (worker thread); None if the download failed"""
+            manifest_blob = bucket_obj.blob(manifest_path.replace(f"gs://{bucket}/", "").lstrip("/"))
+            try:
+                return manifest_blob, _download_blob(manifest_blob)
+            except Exception:
+                logger.warning("Could not download manifest %s", manifest_blob.name, exc_info=True)
+                return manifest_blob, None
+
+        def read_manifest(manifest_blob, manifest_bytes: Optional[bytes]) -> List[Dict[str, Any]]:
+            """Extract the data file entries of one downloaded manifest file"""
+            manifest_data_files = []
+            manifest_path_clean = manifest_blob.name
+            if manifest_bytes is None:
+                return []
             
             try:
-                # Download and parse manifest file (also Avro)
-                manifest_blob = bucket_obj.blob(manifest_path_clean)
+                # Parse manifest file (also Avro)
                 manifest_data = None
                 
                 # Use fastavro for manifest parsing
                 if FASTAVRO_AVAILABLE:
                     try:
-                        from io import BytesIO
-                        manifest_bytes = manifest_blob.download_as_bytes()
-                        manifest_bytes_io = BytesIO(manifest_bytes)
-                        manifest_bytes_io.seek(0)
-                        manifest_data = list(fastavro.reader(manifest_bytes_io))
+                        # Header errors only; corrupt data blocks raise while the entries are
+                        # iterated below and are reported by the handler around this function body
+                        manifest_data = _read_avro(manifest_bytes)
                     except Exception as e:
                         print(f"fastavro manifest parsing failed: {str(e)}")
-                        import traceback
-                        print(traceback.format_exc())
-                        # Last resort: try JSON
+                        logger.debug("fastavro manifest parsing failed", exc_info=True)
+                        # Last resort: try JSON on the same bytes
                         try:
-                            manifest_content = manifest_blob.download_as_text()
-                            manifest_data = json.loads(manifest_content)
+                            manifest_data = orjson.loads(manifest_bytes)
                         except Exception:
-                            continue
+                            return []
                 elif manifest_data is None:
                     print(f"ERROR: Cannot parse manifest {manifest_path_clean} - fastavro not available")
-                    continue
+                    return []
                 
                 # Extract data files from manifest
                 # Iceberg manifest format: list of entries, each with a "data_file" field
-                entries = []
-                if isinstance(manifest_data, list):
-                    entries = manifest_data
-                elif isinstance(manifest_data, dict):
+                entries = manifest_data
+                if isinstance(manifest_data, dict):
                     # Could be wrapped or a single entry
                     if "entries" in manifest_data:
                         entries = manifest_data["entries"]
@@ -148,6 +294,7 @@ def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_
                         entries = [manifest_data]
                     else:
                         # Try to find any list-like structure
+                        entries = []
                         for key, value in manifest_data.items():
                             if isinstance(value, list):
                                 entries = value
@@ -155,100 +302,134 @@ def get_manifest_files(bucket: str, path: str, manifest_list_path: str, project_
                         if not entries:
                             entries = [manifest_data]
                 
-                for entry_idx, entry in enumerate(entries):
-                    # Handle different entry formats
-                    if not isinstance(entry, dict):
-                        continue
-                    
-                    # Avro format: data_file field contains the file info
-                    # Try various field name variations
-                    data_file = (
-                        entry.get("data_file") or
-                        entry.get("dataFile") or
-                        entry  # If entry itself is the data file
-                    )
-                    
-                    if not isinstance(data_file, dict):
+                append = manifest_data_files.append
+                fields = None
+                for entry in entries:
+                    # DELETED entries (status 2) are tombstones for removed files; skip them before
+                    # touching their data file
+                    if isinstance(entry, dict) and entry.get("status") == 2:
                         continue
-                    
-                    # Extract file path - try various field names
-                    file_path = (
-                        data_file.get("file_path") or
-                        data_file.get("filePath") or
-                        data_file.get("path") or
-                        data_file.get("content_path") or
-                        data_file.get("contentPath")
-                    )
-                    
-                    if not file_path:
-                        continue
-                    
-                    # Extract partition - could be in various formats
-                    partition = {}
-                    partition_data = (
-                        data_file.get("partition") or
-                        data_file.get("partition_data") or
-                        data_file.get("partitionData") or
-                        {}
-                    )
-                    if isinstance(partition_data, dict):
-                        # Serialize partition to handle datetime objects
-                        partition = {}
-                        for key, value in partition_data.items():
-                            if isinstance(value, datetime):
-                                partition[key] = value.isoformat()
-                            elif hasattr(value, 'isoformat'):  # datetime-like objects
-                                partition[key] = value.isoformat()
-                            else:
-                                partition[key] = value
-                    
-                    # Extract record count
-                    record_count = (
-                        data_file.get("record_count") or
-                        data_file.get("recordCount") or
-                        data_file.get("num_rows") or
-                        data_file.get("numRows") or
-                        entry.get("record_count") or
-                        entry.get("recordCount") or
-                        0
-                    )
-                    
-                    # Extract file size
-                    file_size = (
-                        data_file.get("file_size_in_bytes") or
-                        data_file.get("fileSizeInBytes") or
-                        data_file.get("file_size") or
-                        data_file.get("fileSize") or
-                        data_file.get("length") or
-                        entry.get("file_size_in_bytes") or
-                        entry.get("fileSizeInBytes") or
-                        0
-                    )
-                    
-                    data_files.append({
-                        "filePath": file_path,
-                        "fileFormat": data_file.get("file_format") or data_file.get("fileFormat") or data_file.get("format") or "parquet",
-                        "partition": partition,
-                        "recordCount": int(record_count) if record_count else 0,
-                        "fileSizeInBytes": int(file_size) if file_size else 0,
-                        "columnSizes": data_file.get("column_sizes") or data_file.get("columnSizes") or {},
-                        "valueCounts": data_file.get("value_counts") or data_file.get("valueCounts") or {},
-                        "nullValueCounts": data_file.get("null_value_counts") or data_file.get("nullValueCounts") or {},
-                    })
+                    if fields is None:
+                        fields = _manifest_fields(entry)
+                    data_file_info = _manifest_data_file(entry, fields)
+                    if data_file_info is not None:
+                        append(data_file_info)
                 
             except Exception as e:
                 # Skip manifests that can't be read
                 print(f"Warning: Could not read manifest {manifest_path_clean}: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                continue
+                logger.debug("Could not read manifest %s", manifest_path_clean, exc_info=True)
+                return []
+
+            return manifest_data_files
+
+        # Each manifest is a separate GCS round-trip; overlap the downloads instead of paying K x RTT.
+        # Decoding stays on this thread (fastavro holds the GIL) and starts as soon as the next
+        # manifest in order has arrived, overlapping with the downloads still in flight.
+        if manifest_paths:
+            with ThreadPoolExecutor(max_workers=min(MANIFEST_FETCH_WORKERS, len(manifest_paths))) as executor:
+                for manifest_blob, manifest_bytes in executor.map(fetch_manifest, manifest_paths):
+                    data_files.extend(read_manifest(manifest_blob, manifest_bytes))
         
         return data_files
     except Exception:
         # Return empty list if we can't read manifests
+        logger.warning("Could not read manifests of %s", manifest_list_path, exc_info=True)
         return []
 
 
+# Snapshot keys read by this backend (and required to rebuild the table in PyIceberg)
+_SNAPSHOT_KEYS = (
+    "snapshot-id", "parent-snapshot-id", "sequence-number", "timestamp-ms",
+    "manifest-list", "manifests", "schema-id",
+)
+
+# Standard Iceberg snapshot summary metrics; engine-specific keys (spark.app.id, ...) are dropped
+_SNAPSHOT_SUMMARY_KEYS = frozenset((
+    "operation",
+    "added-data-files", "deleted-data-files", "total-data-files",
+    "added-delete-files", "removed-delete-files", "total-delete-files",
+    "added-equality-delete-files", "removed-equality-delete-files",
+    "added-position-delete-files", "removed-position-delete-files",
+    "added-records", "deleted-records", "total-records",
+    "added-files-size", "removed-files-size", "total-files-size",
+    "added-position-deletes", "removed-position-deletes", "total-position-deletes",
+    "added-equality-deletes", "removed-equality-deletes", "total-equality-deletes",
+    "deleted-duplicate-files", "changed-partition-count",
+))
+
+
+def _slim_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a metadata.json snapshot to the fixed set of keys we use.
+
+    Long table histories carry thousands of snapshots whose summaries are
+    mostly engine bookkeeping; trimming them at load time shrinks every
+    downstream copy, cache entry and response.
+    """
+    slim = {key: snapshot[key] for key in _SNAPSHOT_KEYS if key in snapshot}
+    summary = snapshot.get("summary")
+    if isinstance(summary, dict):
+        slim["summary"] = {key: value for key, value in summary.items() if key in _SNAPSHOT_SUMMARY_KEYS}
+    return slim
+
+
+def index_by_id(objects: Any, id_key: str) -> Dict[Any, Dict[str, Any]]:
+    """Index a list of metadata objects (schemas, specs, sort orders) by their id"""
+    if type(objects) is not list:
+        return {}
+    return {obj.get(id_key): obj for obj in objects}
+
+
+# v{version}.metadata.json or {version}-{uuid}.metadata.json
+_METADATA_VERSION_RE = re.compile(r"^v?(\d+)[-.]")
+
+
+def parse_metadata_version(filename: str) -> int:
+    """Extract the version number from a metadata file name, or -1 if it has none"""
+    match = _METADATA_VERSION_RE.match(filename)
+    return int(match.group(1)) if match else -1
+
+
+def _blob_updated_ts(blob) -> float:
+    """Update time of a listed blob as a timestamp, 0 when unknown"""
+    return blob.updated.timestamp() if blob.updated else 0
+
+
+def get_latest_metadata_blob(bucket: str, path: str, project_id: Optional[str] = None, token: Optional[str] = None):
+    """Find the newest *.metadata.json blob of a table with a single, name-only listing.
+
+    Only the object name, generation and update time are requested, so this is
+    cheap enough to run on every request to detect whether the table changed.
+    Returns None if no metadata file could be found.
+    """
+    client = get_storage_client(project_id=project_id, token=token)
+    bucket_obj = client.bucket(bucket)
+    metadata_dir = f"{path.strip('/')}/metadata/"
+
+    blobs = bucket_obj.list_blobs(
+        prefix=metadata_dir,
+        match_glob=f"{metadata_dir}*.metadata.json",
+        fields="items(name,generation,updated),nextPageToken",
+    )
+
+    latest_blob = None
+    latest_key = None
+    for blob in blobs:
+        version = parse_metadata_version(blob.name.split("/")[-1])
+        key = (version, _blob_updated_ts(blob))
+        if latest_key is None or key > latest_key:
+            latest_key = key
+            latest_blob = blob
+    return latest_blob
+
+
+# Parsed metadata.json documents keyed by (bucket, object name, generation, token digest). Iceberg never
+# rewrites a metadata file in place, so an entry stays valid until evicted; callers must
+# treat the returned dict as read-only.
+_metadata_dict_cache: LRUCache = LRUCache(maxsize=128)
+_metadata_dict_lock = threading.Lock()
+
+
 def read_iceberg_metadata_manual(bucket: str, path: str, project_id: Optional[str] = None, token: Optional[str] = None) -> Tuple[Dict[str, Any], str, List[Dict[str, Any]]]:
     """Manually read Iceberg metadata from GCS"""
     try:
@@ -263,74 +444,50 @@ def read_iceberg_metadata_manual(bucket: str, path: str, project_id: Optional[st
         metadata_dir = f"{normalized_path}/metadata/"
         
         # List all files in the metadata directory
-        metadata_files = []
+        metadata_json_files = []
         try:
-            all_metadata_files = list(bucket_obj.list_blobs(prefix=metadata_dir))
-            metadata_files = all_metadata_files
+            # Only the *.metadata.json names and update times are used; the directory also holds
+            # every manifest and manifest list, which would otherwise page through the listing too
+            metadata_json_files = list(bucket_obj.list_blobs(
+                prefix=metadata_dir,
+                match_glob=f"{metadata_dir}*.metadata.json",
+                fields="items(name,generation,updated),nextPageToken",
+            ))
         except Exception as e:
             print(f"Error listing metadata directory {metadata_dir}: {str(e)}")
         
-        # If no files found, try alternative paths
-        if not metadata_files:
-            alternative_paths = [
-                f"{normalized_path}/metadata",  # Without trailing slash
-                f"{normalized_path}metadata/",  # No separator
-            ]
-            for alt_path in alternative_paths:
-                try:
-                    files = list(bucket_obj.list_blobs(prefix=alt_path))
-                    metadata_files.extend(files)
-                except Exception:
-                    continue
-        
-        # Filter for metadata JSON files
-        # Iceberg format: v{number}.metadata.json or {number}-{hash}.metadata.json
-        metadata_json_files = []
-        for blob in metadata_files:
-            blob_name = blob.name
-            # Check if it's a metadata.json file
-            if blob_name.endswith(".metadata.json"):
-                # Extract the directory to ensure it's in a metadata/ directory
-                dir_path = "/".join(blob_name.split("/")[:-1])
-                if "metadata" in dir_path.lower():
-                    metadata_json_files.append(blob)
-
-        # If still no files, try broader search
+        # Non-standard layout: list everything under the path once and filter locally.
+        # This covers "{path}/metadata", "{path}metadata/" and metadata files anywhere in the
+        # table, and the same listing feeds the error message if nothing is found.
+        table_files = []
         if not metadata_json_files:
-            # Search for any .metadata.json files in the table path
             try:
-                all_blobs = list(bucket_obj.list_blobs(prefix=normalized_path + "/"))
-                metadata_json_files = [
-                    blob for blob in all_blobs
-                    if blob.name.endswith(".metadata.json")
-                ]
+                table_files = list(bucket_obj.list_blobs(
+                    prefix=normalized_path,
+                    fields="items(name,generation,updated),nextPageToken",
+                ))
             except Exception:
                 pass
+            # Iceberg format: v{number}.metadata.json or {number}-{hash}.metadata.json
+            candidates = [blob for blob in table_files if blob.name.endswith(".metadata.json")]
+            # Prefer files in a metadata directory, otherwise take any metadata file under the path
+            metadata_json_files = [
+                blob for blob in candidates
+                if "metadata" in "/".join(blob.name.split("/")[:-1]).lower()
+            ] or candidates
         
         if not metadata_json_files:
-            # Provide helpful error message with detailed file listing
-            available_files = []
-            metadata_dir_files = []
+            # Provide helpful error message from the listing above
             metadata_prefixes_to_check = [
                 f"{normalized_path}/metadata/",
                 f"{normalized_path}/metadata",
                 f"{normalized_path}metadata/",
             ]
-            
-            try:
-                # List files at the exact path
-                sample_files = list(bucket_obj.list_blobs(prefix=normalized_path, max_results=20))
-                available_files = [f.name for f in sample_files]
-                
-                # Also check metadata directory specifically
-                for prefix in metadata_prefixes_to_check:
-                    try:
-                        meta_files = list(bucket_obj.list_blobs(prefix=prefix, max_results=20))
-                        metadata_dir_files.extend([f.name for f in meta_files])
-                    except Exception:
-                        pass
-            except Exception as e:
-                pass
+            available_files = [f.name for f in table_files[:20]]
+            metadata_dir_files = [
+                f.name for f in table_files
+                if f.name.startswith(tuple(metadata_prefixes_to_check))
+            ]
             
             error_msg = f"No metadata files found at path: {normalized_path}"
             error_msg += f"\n\nSearched prefixes: {', '.join(metadata_prefixes_to_check)}"
@@ -364,23 +521,7 @@ def read_iceberg_metadata_manual(bucket: str, path: str, project_id: Optional[st
             try:
                 # Extract version from filename
                 filename = blob.name.split("/")[-1]
-                version = -1
-                
-                # Try v{version}.metadata.json format
-                if filename.startswith("v") and ".metadata.json" in filename:
-                    try:
-                        version_part = filename.split(".")[0][1:]
-                        version = int(version_part)
-                    except ValueError:
-                        pass
-                
-                # Try {version}-{uuid}.metadata.json format
-                if version == -1 and "-" in filename:
-                    try:
-                        version_part = filename.split("-")[0]
-                        version = int(version_part)
-                    except ValueError:
-                        pass
+                version = parse_metadata_version(filename)
                 
                 # If version found, add to list
                 file_info = {
@@ -400,17 +541,27 @@ def read_iceberg_metadata_manual(bucket: str, path: str, project_id: Optional[st
                 print(f"Error parsing metadata file {blob.name}: {str(e)}")
                 continue
         
-        # If we couldn't determine version from filename, use timestamp
+        # If we couldn't determine version from filename, use timestamp (single pass, no sort)
         if latest_version == -1 and metadata_json_files:
-            metadata_json_files.sort(key=lambda x: x.updated if x.updated else datetime.min, reverse=True)
-            latest_metadata_blob = metadata_json_files[0]
+            latest_metadata_blob = max(metadata_json_files, key=_blob_updated_ts)
         
         if not latest_metadata_blob:
             raise FileNotFoundError(f"Could not determine latest metadata file in {normalized_path}")
             
-        # Read the latest metadata file
-        json_content = latest_metadata_blob.download_as_text()
-        latest_metadata_dict = json.loads(json_content)
+        # Read the latest metadata file, unless this exact generation was parsed before.
+        # Listing does not prove read access (objects.list and objects.get are separate
+        # permissions), so entries are scoped to the caller's credentials.
+        cache_key = (bucket, latest_metadata_blob.name, latest_metadata_blob.generation, token_digest(token))
+        with _metadata_dict_lock:
+            latest_metadata_dict = _metadata_dict_cache.get(cache_key)
+        if latest_metadata_dict is None:
+            # orjson decodes the raw bytes directly
+            latest_metadata_dict = orjson.loads(_download_blob(latest_metadata_blob))
+            if isinstance(latest_metadata_dict.get("snapshots"), list):
+                latest_metadata_dict["snapshots"] = [_slim_snapshot(s) for s in latest_metadata_dict["snapshots"]]
+            if latest_metadata_blob.generation is not None:
+                with _metadata_dict_lock:
+                    _metadata_dict_cache[cache_key] = latest_metadata_dict
         
         # Update the info for the latest file with actual content
         latest_file_path = f"gs://{bucket}/{latest_metadata_blob.name}"
@@ -423,12 +574,99 @@ def read_iceberg_metadata_manual(bucket: str, path: str, project_id: Optional[st
         return latest_metadata_dict, latest_file_path, metadata_files_info
         
     except Exception as e:
-        import traceback
         error_detail = f"Failed to read metadata: {str(e)}"
         error_detail += f"\nPath: {path}"
         error_detail += f"\nBucket: {bucket}"
-        error_detail += f"\nTraceback: {traceback.format_exc()}"
-        raise Exception(error_detail)
+        # The original exception stays attached as __cause__ rather than being formatted here
+        raise Exception(error_detail) from e
+
+
+# StaticTables, with their FileIO and GCS filesystem, per metadata file and caller. A table
+# change writes a new metadata file (a new key); entries expire well before the token expiry
+# handed to PyArrow in get_static_table.
+_static_table_cache: TTLCache = TTLCache(maxsize=64, ttl=900)
+_static_table_lock = threading.Lock()
+
+
+def get_static_table(metadata_dict: Dict[str, Any], metadata_location: str, token: Optional[str] = None):
+    """Return a StaticTable for a metadata file, reusing one built earlier for the same caller"""
+    cache_key = (metadata_location, token_digest(token))
+    with _static_table_lock:
+        table = _static_table_cache.get(cache_key)
+    if table is not None:
+        return table
+
+    # Prepare properties with token if available
+    properties = {}
+    if token:
+        properties["gcs.oauth2.token"] = token
+        # Set expiration to 1 hour from now (in milliseconds)
+        # PyArrow GcsFileSystem requires both token and expiration
+        expiration_ms = int((time.time() + 3600) * 1000)
+        properties["gcs.oauth2.token-expires-at"] = str(expiration_ms)
+
+    print(f"Loading StaticTable from metadata: {metadata_location}")
+    table = load_static_table(metadata_dict, metadata_location, properties)
+    with _static_table_lock:
+        _static_table_cache[cache_key] = table
+    return table
+
+
+def load_static_table(metadata_dict: Dict[str, Any], metadata_location: str, properties: Dict[str, str]):
+    """Build a StaticTable from metadata.json content that was already downloaded.
+
+    StaticTable.from_metadata would fetch the same metadata file a second time
+    through its own FileIO; parsing the dict we already hold saves that GCS
+    round-trip. Falls back to from_metadata if the dict cannot be converted.
+    """
+    try:
+        from pyiceberg.io import load_file_io
+        from pyiceberg.table.metadata import TableMetadataUtil
+        from pyiceberg.catalog.noop import NoopCatalog
+
+        metadata = TableMetadataUtil.parse_obj(metadata_dict)
+        return StaticTable(
+            identifier=("static-table", metadata_location),
+            metadata_location=metadata_location,
+            metadata=metadata,
+            io=load_file_io({**properties, **metadata.properties}, location=metadata_location),
+            catalog=NoopCatalog("static-table"),
+        )
+    except Exception:
+        logger.warning("Could not reuse downloaded metadata for StaticTable, re-reading it", exc_info=True)
+        return StaticTable.from_metadata(metadata_location, properties=properties)
+
+
+def _windowed_map(executor: ThreadPoolExecutor, fn, items, window: int):
+    """Like executor.map, but with at most `window` calls submitted and not yet consumed"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _partition_tuple(partition: Any) -> Optional[tuple]:
+    """Hashable grouping key of a data file's partition Record, None if it cannot be read"""
+    try:
+        return tuple(partition) if partition else ()
+    except Exception:
+        return None
+
+
+def _partition_display_name(part_tuple: Optional[tuple], record: Any) -> str:
+    """Label of a partition group in the snapshot tree"""
+    if part_tuple is None:
+        return "Unknown Partition"
+    if not part_tuple:
+        return "Unpartitioned"
+    try:
+        # record is the PyIceberg Record the group was keyed from
+        return str(record).replace("Record", "").strip("()") or "Unpartitioned"
+    except Exception:
+        return "Unknown Partition"
 
 
 def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional[str] = None, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -453,109 +691,135 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
             else:
                 full_metadata_location = metadata_location
                 
-            # Prepare properties with token if available
-            properties = {}
-            if token:
-                properties["gcs.oauth2.token"] = token
-                # Set expiration to 1 hour from now (in milliseconds)
-                # PyArrow GcsFileSystem requires both token and expiration
-                import time
-                expiration_ms = int((time.time() + 3600) * 1000)
-                properties["gcs.oauth2.token-expires-at"] = str(expiration_ms)
-                
-            print(f"Loading StaticTable from metadata: {full_metadata_location}")
-            table = StaticTable.from_metadata(full_metadata_location, properties=properties)
+            table = get_static_table(metadata_dict, full_metadata_location, token)
             
             # Extract namespace and table name from path
             table_name = normalized_path.split("/")[-1] if "/" in normalized_path else normalized_path
             
             # Now use PyIceberg's API to get all information
-            # Get schema
-            schema = table.schema()
-            schema_fields = []
-            for field in schema.fields:
-                schema_fields.append({
+            # Get schema (comprehensions keep per-field work minimal on very wide tables)
+            schema_fields = [
+                {
                     "id": field.field_id,
                     "name": field.name,
                     "type": str(field.field_type),
                     "required": field.required,
-                    "doc": field.doc if hasattr(field, 'doc') else None,
-                })
+                    "doc": field.doc,
+                }
+                for field in table.schema().fields
+            ]
             
             # Get partition spec
             partition_spec = table.spec()
-            partition_spec_fields = []
-            for field in partition_spec.fields:
-                partition_spec_fields.append({
+            partition_spec_fields = [
+                {
                     "fieldId": field.field_id,
                     "sourceId": field.source_id,
                     "name": field.name,
                     "transform": str(field.transform),
-                })
+                }
+                for field in partition_spec.fields
+            ]
             
             # Get sort order
-            sort_order_obj = table.sort_order()
-            sort_order_fields = []
-            for field in sort_order_obj.fields:
-                sort_order_fields.append({
+            sort_order_fields = [
+                {
                     "orderId": field.direction,
                     "direction": "asc" if field.direction == 1 else "desc",
                     "nullOrder": "nulls-first" if field.null_order == 1 else "nulls-last",
                     "sortFieldId": field.source_id,
-                })
+                }
+                for field in table.sort_order().fields
+            ]
             
-            # Scan the table to get all data files and partitions
-            scan_builder = table.scan()
-            file_scan_tasks = scan_builder.plan_files()
+            # Read the entries of every manifest in the current snapshot once. They feed both the
+            # data file list and the manifest tree below; plan_files() would read them all again.
+            # Each read is a GCS round-trip, so fetch them concurrently.
+            current_snapshot = table.current_snapshot()
+            manifests = current_snapshot.manifests(table.io) if current_snapshot else []
+
+            def fetch_entries(manifest):
+                try:
+                    return manifest.fetch_manifest_entry(table.io), None
+                except Exception as e:
+                    return None, e
+
+            with ThreadPoolExecutor(max_workers=max(1, min(MANIFEST_FETCH_WORKERS, len(manifests)))) as executor:
+                manifest_entries = list(executor.map(fetch_entries, manifests))
             
             data_files = []
             partition_map = {}
             
-            for task in file_scan_tasks:
-                data_file = task.file
-                # Extract partition information
-                # Extract partition information
-                partition = {}
-                if hasattr(data_file, 'partition') and data_file.partition:
-                    try:
-                        spec = table.specs()[data_file.spec_id]
-                        # Map partition fields to values
-                        for field in spec.fields:
-                            # Access value by field name from the partition record
-                            val = getattr(data_file.partition, field.name, None)
-                            partition[field.name] = val
-                    except Exception:
-                        # Fallback if something goes wrong
-                        partition = {}
+            # Partition field names per spec, resolved once instead of per data file
+            partition_field_names = {
+                spec_id: [field.name for field in spec.fields]
+                for spec_id, spec in table.specs().items()
+            }
+
+            # Live data files, as plan_files() would return them
+            append_file = data_files.append
+            for manifest, (entries, fetch_error) in zip(manifests, manifest_entries):
+                if fetch_error is not None:
+                    raise fetch_error
+                if manifest.content == 1: # DELETES
+                    continue
+                for entry in entries:
+                    if entry.status == 2: # DELETED
+                        continue
+                    data_file = entry.data_file
+                    # Extract partition information
+                    partition = {}
+                    if hasattr(data_file, 'partition') and data_file.partition:
+                        try:
+                            # Map partition fields to values by name from the partition record
+                            partition_record = data_file.partition
+                            partition = {
+                                name: getattr(partition_record, name, None)
+                                for name in partition_field_names[data_file.spec_id]
+                            }
+                        except Exception:
+                            # Fallback if something goes wrong
+                            partition = {}
                 
-                partition_key = json.dumps(partition, sort_keys=True)
+                    # Partition values from PyIceberg are primitives, so the sorted items hash directly
+                    partition_key = tuple(sorted(partition.items()))
                 
-                file_info = {
-                    "filePath": data_file.file_path if hasattr(data_file, 'file_path') else str(data_file),
-                    "fileFormat": "parquet",  # Iceberg typically uses Parquet
-                    "partition": partition,
-                    "recordCount": data_file.record_count if hasattr(data_file, 'record_count') else 0,
-                    "fileSizeInBytes": data_file.file_size_in_bytes if hasattr(data_file, 'file_size_in_bytes') else 0,
-                }
-                data_files.append(file_info)
+                    # PyIceberg DataFiles always carry these attributes; only fall back for odd objects
+                    try:
+                        file_info = {
+                            "filePath": data_file.file_path,
+                            "fileFormat": "parquet",  # Iceberg typically uses Parquet
+                            "partition": partition,
+                            "recordCount": data_file.record_count,
+                            "fileSizeInBytes": data_file.file_size_in_bytes,
+                        }
+                    except AttributeError:
+                        file_info = {
+                            "filePath": getattr(data_file, 'file_path', None) or str(data_file),
+                            "fileFormat": "parquet",
+                            "partition": partition,
+                            "recordCount": getattr(data_file, 'record_count', 0),
+                            "fileSizeInBytes": getattr(data_file, 'file_size_in_bytes', 0),
+                        }
+                    append_file(file_info)
                 
-                # Aggregate partition stats
-                if partition_key not in partition_map:
-                    partition_map[partition_key] = {
-                        "partition": partition,
-                        "fileCount": 0,
-                        "recordCount": 0,
-                        "totalSize": 0,
-                    }
-                partition_map[partition_key]["fileCount"] += 1
-                partition_map[partition_key]["recordCount"] += file_info["recordCount"]
-                partition_map[partition_key]["totalSize"] += file_info["fileSizeInBytes"]
+                    # Aggregate partition stats
+                    stats = partition_map.get(partition_key)
+                    if stats is None:
+                        stats = partition_map[partition_key] = {
+                            "partition": partition,
+                            "fileCount": 0,
+                            "recordCount": 0,
+                            "totalSize": 0,
+                        }
+                    stats["fileCount"] += 1
+                    stats["recordCount"] += file_info["recordCount"]
+                    stats["totalSize"] += file_info["fileSizeInBytes"]
             
             partition_stats = list(partition_map.values())
             
             # Get snapshots
             snapshots = []
-            current_snapshot = table.current_snapshot()
             if current_snapshot:
                 snapshot_data = {
                     "snapshotId": str(current_snapshot.snapshot_id),
@@ -566,8 +830,8 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
                 }
                 
                 try:
-                    # Get manifests
-                    for manifest in current_snapshot.manifests(table.io):
+                    # Get manifests (entries were fetched above)
+                    for manifest, (entries, fetch_error) in zip(manifests, manifest_entries):
                         manifest_data = {
                             "path": manifest.manifest_path,
                             "length": manifest.manifest_length,
@@ -575,38 +839,38 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
                             "addedSnapshotId": manifest.added_snapshot_id,
                             "dataFiles": []
                         }
-                        
-                        # Get data files for this manifest (grouped by partition)
+
                         # Get data files for this manifest (grouped by partition)
                         try:
-                            entries = manifest.fetch_manifest_entry(table.io)
-                            
+                            if fetch_error is not None:
+                                raise fetch_error
+
                             # Check if table is partitioned
                             is_partitioned = len(table.spec().fields) > 0
-                            
+
                             if not is_partitioned:
                                 # Unpartitioned table: add files directly to manifest
                                 manifest_data["dataFiles"] = []
-                                file_count = 0
-                                
+
                                 for entry in entries:
                                     # Skip deleted files
                                     if entry.status == 2: # DELETED
                                         continue
-                                        
+
+                                    # Limit to 10 files for unpartitioned tables to avoid clutter;
+                                    # nothing else is needed from the remaining entries
+                                    if len(manifest_data["dataFiles"]) >= 10:
+                                        break
+
                                     data_file = entry.data_file
-                                    file_count += 1
-                                    
-                                    # Limit to 10 files for unpartitioned tables to avoid clutter
-                                    if len(manifest_data["dataFiles"]) < 10:
-                                        manifest_data["dataFiles"].append({
-                                            "path": data_file.file_path,
-                                            "format": str(data_file.file_format),
-                                            "recordCount": data_file.record_count,
-                                            "fileSizeInBytes": data_file.file_size_in_bytes
-                                        })
-                                
-                                # Add "more" indicator if needed (handled by frontend if dataFiles < file_count?)
+                                    manifest_data["dataFiles"].append({
+                                        "path": data_file.file_path,
+                                        "format": str(data_file.file_format),
+                                        "recordCount": data_file.record_count,
+                                        "fileSizeInBytes": data_file.file_size_in_bytes
+                                    })
+
+                                # Add "more" indicator if needed (handled by frontend if dataFiles < file count?)
                                 # The frontend expects "dataFiles" list. If we want to show "more", we might need a way to indicate total count.
                                 # Current frontend logic for "dataFiles" doesn't seem to show "more" node explicitly for direct dataFiles,
                                 # but we can add a "more" node if we want, or just rely on the user seeing 10 files.
@@ -616,62 +880,54 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
                                 # It just iterates all of them.
                                 # So we should probably limit strictly or add a "more" node manually if we want.
                                 # For now, let's just limit to 10.
-                                
+
                             else:
-                                # Partitioned table: group by partition
-                                partition_groups = {}
-                                partition_counts = {}
-                                
-                                for entry in entries:
-                                    # Skip deleted files
-                                    if entry.status == 2: # DELETED
-                                        continue
+                                # Partitioned table: group by the partition values themselves; the display
+                                # name is only formatted for the partitions that end up in the response
+                                live_files = [entry.data_file for entry in entries if entry.status != 2]  # Skip deleted files
+                                partition_keys = [_partition_tuple(getattr(data_file, 'partition', None)) for data_file in live_files]
+                                partition_counts = Counter(partition_keys)
 
-                                    data_file = entry.data_file
-                                    # Extract partition info
-                                    partition_str = "Unpartitioned"
-                                    if hasattr(data_file, 'partition') and data_file.partition:
-                                        try:
-                                            # Convert partition record to string representation
-                                            # data_file.partition is a Record.
-                                            partition_str = str(data_file.partition).replace("Record", "").strip("()")
-                                            if not partition_str or partition_str == "()":
-                                                partition_str = "Unpartitioned"
-                                        except Exception:
-                                            partition_str = "Unknown Partition"
-                                    
-                                    if partition_str not in partition_groups:
-                                        partition_groups[partition_str] = []
-                                        partition_counts[partition_str] = 0
-                                    
-                                    partition_counts[partition_str] += 1
-                                    
-                                    if len(partition_groups[partition_str]) < 5:
-                                        partition_groups[partition_str].append({
-                                            "path": data_file.file_path,
-                                            "format": str(data_file.file_format),
-                                            "recordCount": data_file.record_count,
-                                            "fileSizeInBytes": data_file.file_size_in_bytes
-                                        })
-                                
-                                # Convert groups to list (limit to 5 partitions)
-                                manifest_data["partitions"] = []
-                                sorted_partitions = sorted(partition_groups.keys())
+                                try:
+                                    sorted_partitions = sorted(partition_counts)
+                                except TypeError:
+                                    # Mixed value types (or None) across partitions
+                                    sorted_partitions = sorted(partition_counts, key=repr)
                                 manifest_data["totalPartitionCount"] = len(sorted_partitions)
-                                
-                                for i, p_name in enumerate(sorted_partitions):
-                                    if i >= 5:
-                                        break
-                                    p_files = partition_groups[p_name]
-                                    manifest_data["partitions"].append({
-                                        "name": p_name,
-                                        "fileCount": partition_counts[p_name],
-                                        "dataFiles": p_files
+
+                                # Only the first 5 partitions are shown with up to 5 files each, so
+                                # stop collecting samples as soon as those are filled
+                                partition_groups = {part_tuple: [] for part_tuple in sorted_partitions[:5]}
+                                partition_records = {}
+                                remaining = len(partition_groups)
+                                for part_tuple, data_file in zip(partition_keys, live_files):
+                                    files = partition_groups.get(part_tuple)
+                                    if files is None or len(files) >= 5:
+                                        continue
+                                    partition_records.setdefault(part_tuple, getattr(data_file, 'partition', None))
+                                    files.append({
+                                        "path": data_file.file_path,
+                                        "format": str(data_file.file_format),
+                                        "recordCount": data_file.record_count,
+                                        "fileSizeInBytes": data_file.file_size_in_bytes
                                     })
-                                
+                                    if len(files) == 5:
+                                        remaining -= 1
+                                        if not remaining:
+                                            break
+
+                                manifest_data["partitions"] = [
+                                    {
+                                        "name": _partition_display_name(part_tuple, partition_records.get(part_tuple)),
+                                        "fileCount": partition_counts[part_tuple],
+                                        "dataFiles": files
+                                    }
+                                    for part_tuple, files in partition_groups.items()
+                                ]
+
                         except Exception as e:
                             print(f"Error reading manifest entries for {manifest.manifest_path}: {e}")
-                            
+
                         snapshot_data["manifests"].append(manifest_data)
                 except Exception as e:
                     print(f"Error reading manifests for snapshot {current_snapshot.snapshot_id}: {e}")
@@ -705,23 +961,13 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
                 }
                 
                 # Check if current file is already in log (it usually isn't)
-                if not any(f["file"] == current_file_info["file"] for f in log_files):
+                logged_files = {f["file"] for f in log_files}
+                if current_file_info["file"] not in logged_files:
                     log_files.append(current_file_info)
                 
                 # Try to extract versions from filenames for better display
                 for f in log_files:
-                    try:
-                        filename = f["file"].split("/")[-1]
-                        if filename.startswith("v") and ".metadata.json" in filename:
-                            version_part = filename.split(".")[0][1:]
-                            f["version"] = int(version_part)
-                        elif "-" in filename:
-                             # Try {version}-{uuid}
-                             parts = filename.split("-")
-                             if parts[0].isdigit():
-                                 f["version"] = int(parts[0])
-                    except:
-                        pass
+                    f["version"] = parse_metadata_version(f["file"].rsplit("/", 1)[-1])
                 
                 final_metadata_files = log_files
 
@@ -742,8 +988,7 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
             
         except Exception as catalog_error:
             print(f"PyIceberg catalog/table loading failed: {catalog_error}")
-            import traceback
-            print(traceback.format_exc())
+            logger.debug("PyIceberg catalog/table loading failed", exc_info=True)
             # Fall through to manual parsing
             pass
         
@@ -754,65 +999,59 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
         schema_fields = []
         current_schema_id = metadata_dict.get("current-schema-id", 0)
         
-        if "schemas" in metadata_dict and isinstance(metadata_dict["schemas"], list):
-            for schema_obj in metadata_dict["schemas"]:
-                if schema_obj.get("schema-id") == current_schema_id:
-                    if "fields" in schema_obj:
-                        # Use PyIceberg Schema to parse properly
-                        try:
-                            from pyiceberg.schema import Schema
-                            # Convert schema dict to PyIceberg Schema
-                            schema_json_str = json.dumps(schema_obj)
-                            # PyIceberg Schema.from_json() expects the full schema structure
-                            # For now, parse fields manually but correctly
-                            for field in schema_obj["fields"]:
-                                field_type = field.get("type", "string")
-                                # Handle nested types properly
-                                if isinstance(field_type, dict):
-                                    base_type = field_type.get("type", "string")
-                                    if "element-id" in field_type:
-                                        element_type = field_type.get("element-type", {})
-                                        if isinstance(element_type, dict):
-                                            element_base = element_type.get("type", "string")
-                                        else:
-                                            element_base = str(element_type)
-                                        type_str = f"list<{element_base}>"
-                                    elif "key-id" in field_type:
-                                        key_type = field_type.get("key-type", {})
-                                        value_type = field_type.get("value-type", {})
-                                        key_str = key_type.get("type", "string") if isinstance(key_type, dict) else str(key_type)
-                                        value_str = value_type.get("type", "string") if isinstance(value_type, dict) else str(value_type)
-                                        type_str = f"map<{key_str},{value_str}>"
-                                    else:
-                                        type_str = base_type
-                                else:
-                                    type_str = str(field_type)
-                                
-                                schema_fields.append({
-                                    "id": field.get("id", 0),
-                                    "name": field.get("name", ""),
-                                    "type": type_str,
-                                    "required": field.get("required", False),
-                                    "doc": field.get("doc"),
-                                })
-                        except Exception as schema_error:
-                            print(f"PyIceberg schema parsing error: {schema_error}")
-                            # Fallback to manual parsing
-                            for field in schema_obj["fields"]:
-                                field_type = field.get("type", "string")
-                                if isinstance(field_type, dict):
-                                    type_str = field_type.get("type", str(field_type))
-                                else:
-                                    type_str = str(field_type)
-                                
-                                schema_fields.append({
-                                    "id": field.get("id", 0),
-                                    "name": field.get("name", ""),
-                                    "type": type_str,
-                                    "required": field.get("required", False),
-                                    "doc": field.get("doc"),
-                                })
-                    break
+        schema_obj = index_by_id(metadata_dict.get("schemas"), "schema-id").get(current_schema_id)
+        if schema_obj and "fields" in schema_obj:
+            # Use PyIceberg Schema to parse properly
+            try:
+                # PyIceberg Schema.from_json() expects the full schema structure
+                # For now, parse fields manually but correctly
+                for field in schema_obj["fields"]:
+                    field_type = field.get("type", "string")
+                    # Handle nested types properly
+                    if isinstance(field_type, dict):
+                        base_type = field_type.get("type", "string")
+                        if "element-id" in field_type:
+                            element_type = field_type.get("element-type", {})
+                            if isinstance(element_type, dict):
+                                element_base = element_type.get("type", "string")
+                            else:
+                                element_base = str(element_type)
+                            type_str = f"list<{element_base}>"
+                        elif "key-id" in field_type:
+                            key_type = field_type.get("key-type", {})
+                            value_type = field_type.get("value-type", {})
+                            key_str = key_type.get("type", "string") if isinstance(key_type, dict) else str(key_type)
+                            value_str = value_type.get("type", "string") if isinstance(value_type, dict) else str(value_type)
+                            type_str = f"map<{key_str},{value_str}>"
+                        else:
+                            type_str = base_type
+                    else:
+                        type_str = str(field_type)
+                    
+                    schema_fields.append({
+                        "id": field.get("id", 0),
+                        "name": field.get("name", ""),
+                        "type": type_str,
+                        "required": field.get("required", False),
+                        "doc": field.get("doc"),
+                    })
+            except Exception as schema_error:
+                print(f"PyIceberg schema parsing error: {schema_error}")
+                # Fallback to manual parsing
+                for field in schema_obj["fields"]:
+                    field_type = field.get("type", "string")
+                    if isinstance(field_type, dict):
+                        type_str = field_type.get("type", str(field_type))
+                    else:
+                        type_str = str(field_type)
+                    
+                    schema_fields.append({
+                        "id": field.get("id", 0),
+                        "name": field.get("name", ""),
+                        "type": type_str,
+                        "required": field.get("required", False),
+                        "doc": field.get("doc"),
+                    })
         
         # Remove excessive debug output - only log important info
         print(f"Analyzing table: {table_location}")
@@ -825,18 +1064,15 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
         default_spec_id = metadata_dict.get("default-spec-id", 0)
         
         if "partition-specs" in metadata_dict and isinstance(metadata_dict["partition-specs"], list):
-            # Find the spec with matching spec-id
-            for spec_obj in metadata_dict["partition-specs"]:
-                if spec_obj.get("spec-id") == default_spec_id:
-                    if "fields" in spec_obj:
-                        for field in spec_obj["fields"]:
-                            partition_spec.append({
-                                "fieldId": field.get("field-id", 0),
-                                "sourceId": field.get("source-id", 0),
-                                "name": field.get("name", ""),
-                                "transform": field.get("transform", ""),
-                            })
-                    break
+            spec_obj = index_by_id(metadata_dict["partition-specs"], "spec-id").get(default_spec_id)
+            if spec_obj and "fields" in spec_obj:
+                for field in spec_obj["fields"]:
+                    partition_spec.append({
+                        "fieldId": field.get("field-id", 0),
+                        "sourceId": field.get("source-id", 0),
+                        "name": field.get("name", ""),
+                        "transform": field.get("transform", ""),
+                    })
         # Fallback to "partition-spec" (singular)
         elif "partition-spec" in metadata_dict:
             spec = metadata_dict["partition-spec"]
@@ -854,18 +1090,15 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
         default_sort_order_id = metadata_dict.get("default-sort-order-id", 0)
         
         if "sort-orders" in metadata_dict and isinstance(metadata_dict["sort-orders"], list):
-            # Find the sort order with matching order-id
-            for order_obj in metadata_dict["sort-orders"]:
-                if order_obj.get("order-id") == default_sort_order_id:
-                    if "fields" in order_obj:
-                        for field in order_obj["fields"]:
-                            sort_order.append({
-                                "orderId": field.get("order-id", 0),
-                                "direction": field.get("direction", "asc"),
-                                "nullOrder": field.get("null-order", "nulls-first"),
-                                "sortFieldId": field.get("field-id", 0),
-                            })
-                    break
+            order_obj = index_by_id(metadata_dict["sort-orders"], "order-id").get(default_sort_order_id)
+            if order_obj and "fields" in order_obj:
+                for field in order_obj["fields"]:
+                    sort_order.append({
+                        "orderId": field.get("order-id", 0),
+                        "direction": field.get("direction", "asc"),
+                        "nullOrder": field.get("null-order", "nulls-first"),
+                        "sortFieldId": field.get("field-id", 0),
+                    })
         # Fallback to "sort-order" (singular)
         elif "sort-order" in metadata_dict:
             order = metadata_dict["sort-order"]
@@ -882,124 +1115,135 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
         current_snapshot_id = metadata_dict.get("current-snapshot-id", -1)
         print(f"Processing table with current-snapshot-id: {current_snapshot_id}")
         snapshots = []
-        all_data_files = []  # All data files across all snapshots
-        snapshot_data_files = {}  # Data files per snapshot
+        total_files = 0  # Data files across all snapshots
+        snapshot_aggregates = {}  # (file count, record count, total size) per snapshot
+
+        # Overall partition stats, aggregated snapshot by snapshot so no snapshot's
+        # file list has to be kept once it has been counted
+        partition_map = {}
+
+        def serialize_partition(part):
+            """Convert partition dict to JSON-serializable format"""
+            if not part:
+                return {}
+            return {
+                key: value.isoformat() if hasattr(value, 'isoformat') else value  # datetime-like objects
+                for key, value in part.items()
+            }
+
+        def add_partition_stats(files):
+            for file in files:
+                partition = file.get("partition") or {}
+                # Key on the raw partition values; they are only serialized once per partition
+                partition_key = tuple(sorted(partition.items()))
+                try:
+                    stats = partition_map.get(partition_key)
+                except TypeError:
+                    # Unhashable partition value, fall back to its JSON form
+                    partition_key = orjson.dumps(serialize_partition(partition), option=orjson.OPT_SORT_KEYS)
+                    stats = partition_map.get(partition_key)
+                if stats is None:
+                    stats = partition_map[partition_key] = {
+                        # Serialize partition to handle datetime objects
+                        "partition": serialize_partition(partition),
+                        "fileCount": 0,
+                        "recordCount": 0,
+                        "totalSize": 0,
+                    }
+                stats["fileCount"] += 1
+                stats["recordCount"] += file.get("recordCount", 0)
+                stats["totalSize"] += file.get("fileSizeInBytes", 0)
         
         # Process each snapshot to get per-snapshot statistics
         if "snapshots" in metadata_dict and isinstance(metadata_dict["snapshots"], list):
             print(f"Found {len(metadata_dict['snapshots'])} snapshots")
             previous_snapshot_id = None
-            
-            for idx, snapshot in enumerate(metadata_dict["snapshots"]):
-                # Use snapshot-id, not sequence-number
+            snapshot_list = metadata_dict["snapshots"]
+
+            def load_snapshot_files(snapshot):
+                """Data files of one snapshot; empty if its manifests cannot be read"""
                 snapshot_id = snapshot.get("snapshot-id", snapshot.get("sequence-number", 0))
                 manifest_list = snapshot.get("manifest-list", "")
-                parent_snapshot_id = snapshot.get("parent-snapshot-id")
-                
-                timestamp_ms = snapshot.get("timestamp-ms", 0)
+                if not manifest_list:
+                    return []
                 try:
-                    if timestamp_ms and timestamp_ms > 0:
-                        timestamp = datetime.fromtimestamp(timestamp_ms / 1000).isoformat()
-                    else:
-                        timestamp = datetime.now().isoformat()
-                except (ValueError, OSError, OverflowError):
-                    timestamp = datetime.now().isoformat()
-                
-                # Get data files for this snapshot
-                snapshot_files = []
-                if manifest_list:
+                    snapshot_files = get_manifest_files(bucket, normalized_path, manifest_list, project_id, token)
+                    print(f"Snapshot {snapshot_id}: {len(snapshot_files)} data files")
+                    return snapshot_files
+                except Exception as e:
+                    print(f"Warning: Could not load manifest files for snapshot {snapshot_id}: {str(e)}")
+                    return []
+
+            # Every snapshot's manifest list is independent GCS I/O; read them concurrently and
+            # compute the per-snapshot statistics in snapshot order as results arrive, dropping
+            # each file list once it is counted. Only a window of snapshots is in flight, so at most
+            # that many file lists are held while an earlier snapshot is still loading
+            with ThreadPoolExecutor(max_workers=max(1, min(SNAPSHOT_FETCH_WORKERS, len(snapshot_list)))) as executor:
+                files_per_snapshot = _windowed_map(executor, load_snapshot_files, snapshot_list, SNAPSHOT_FETCH_WORKERS)
+                for idx, (snapshot, snapshot_files) in enumerate(zip(snapshot_list, files_per_snapshot)):
+                    # Use snapshot-id, not sequence-number
+                    snapshot_id = snapshot.get("snapshot-id", snapshot.get("sequence-number", 0))
+                    manifest_list = snapshot.get("manifest-list", "")
+                    parent_snapshot_id = snapshot.get("parent-snapshot-id")
+                    
+                    timestamp_ms = snapshot.get("timestamp-ms", 0)
                     try:
-                        snapshot_files = get_manifest_files(bucket, normalized_path, manifest_list, project_id, token)
-                        print(f"Snapshot {snapshot_id}: {len(snapshot_files)} data files")
-                    except Exception as e:
-                        print(f"Warning: Could not load manifest files for snapshot {snapshot_id}: {str(e)}")
-                
-                snapshot_data_files[snapshot_id] = snapshot_files
-                all_data_files.extend(snapshot_files)
-                
-                # Calculate per-snapshot statistics
-                snapshot_file_count = len(snapshot_files)
-                snapshot_record_count = sum(f.get("recordCount", 0) for f in snapshot_files)
-                snapshot_total_size = sum(f.get("fileSizeInBytes", 0) for f in snapshot_files)
-                
-                # Calculate delta from previous snapshot
-                delta = {}
-                if parent_snapshot_id and parent_snapshot_id in snapshot_data_files:
-                    prev_files = snapshot_data_files[parent_snapshot_id]
-                    prev_record_count = sum(f.get("recordCount", 0) for f in prev_files)
-                    prev_total_size = sum(f.get("fileSizeInBytes", 0) for f in prev_files)
-                    delta = {
-                        "addedFiles": snapshot_file_count - len(prev_files),
-                        "addedRecords": snapshot_record_count - prev_record_count,
-                        "addedSize": snapshot_total_size - prev_total_size,
-                    }
-                else:
-                    # First snapshot or no parent
-                    delta = {
-                        "addedFiles": snapshot_file_count,
-                        "addedRecords": snapshot_record_count,
-                        "addedSize": snapshot_total_size,
-                    }
-                
-                summary = snapshot.get("summary", {})
-                snapshots.append({
-                    "snapshotId": str(snapshot_id),  # Convert to string to preserve precision
-                    "sequenceNumber": snapshot.get("sequence-number", idx + 1),
-                    "timestamp": timestamp,
-                    "summary": summary,
-                    "manifestList": manifest_list,
-                    "parentSnapshotId": str(parent_snapshot_id) if parent_snapshot_id else None,
-                    "statistics": {
-                        "fileCount": snapshot_file_count,
-                        "recordCount": snapshot_record_count,
-                        "totalSize": snapshot_total_size,
-                        "delta": delta,
-                    },
-                })
-        
-        print(f"Total data files across all snapshots: {len(all_data_files)}")
-        
-        # Calculate overall partition stats from all data files
-        partition_stats = []
-        partition_map = {}
-        
-        def serialize_partition(part):
-            """Convert partition dict to JSON-serializable format"""
-            if not part:
-                return {}
-            serialized = {}
-            for key, value in part.items():
-                if isinstance(value, datetime):
-                    serialized[key] = value.isoformat()
-                elif hasattr(value, 'isoformat'):  # datetime-like objects
-                    serialized[key] = value.isoformat()
-                else:
-                    serialized[key] = value
-            return serialized
+                        if timestamp_ms and timestamp_ms > 0:
+                            timestamp = datetime.fromtimestamp(timestamp_ms / 1000).isoformat()
+                        else:
+                            timestamp = datetime.now().isoformat()
+                    except (ValueError, OSError, OverflowError):
+                        timestamp = datetime.now().isoformat()
+                    
+                    add_partition_stats(snapshot_files)
+                    
+                    # Calculate per-snapshot statistics
+                    snapshot_file_count = len(snapshot_files)
+                    total_files += snapshot_file_count
+                    snapshot_record_count, snapshot_total_size = _file_totals(snapshot_files)
+                    # Children only need these totals, not the parent's file list
+                    snapshot_aggregates[snapshot_id] = (snapshot_file_count, snapshot_record_count, snapshot_total_size)
+                    
+                    # Calculate delta from previous snapshot
+                    delta = {}
+                    if parent_snapshot_id and parent_snapshot_id in snapshot_aggregates:
+                        prev_file_count, prev_record_count, prev_total_size = snapshot_aggregates[parent_snapshot_id]
+                        delta = {
+                            "addedFiles": snapshot_file_count - prev_file_count,
+                            "addedRecords": snapshot_record_count - prev_record_count,
+                            "addedSize": snapshot_total_size - prev_total_size,
+                        }
+                    else:
+                        # First snapshot or no parent
+                        delta = {
+                            "addedFiles": snapshot_file_count,
+                            "addedRecords": snapshot_record_count,
+                            "addedSize": snapshot_total_size,
+                        }
+                    
+                    summary = snapshot.get("summary", {})
+                    snapshots.append({
+                        "snapshotId": str(snapshot_id),  # Convert to string to preserve precision
+                        "sequenceNumber": snapshot.get("sequence-number", idx + 1),
+                        "timestamp": timestamp,
+                        "summary": summary,
+                        "manifestList": manifest_list,
+                        "parentSnapshotId": str(parent_snapshot_id) if parent_snapshot_id else None,
+                        "statistics": {
+                            "fileCount": snapshot_file_count,
+                            "recordCount": snapshot_record_count,
+                            "totalSize": snapshot_total_size,
+                            "delta": delta,
+                        },
+                    })
         
-        for file in all_data_files:
-            partition = file.get("partition", {})
-            # Serialize partition to handle datetime objects
-            partition_serialized = serialize_partition(partition)
-            # Create a consistent partition key
-            partition_key = json.dumps(partition_serialized, sort_keys=True) if partition_serialized else "{}"
-            if partition_key not in partition_map:
-                partition_map[partition_key] = {
-                    "partition": partition_serialized,
-                    "fileCount": 0,
-                    "recordCount": 0,
-                    "totalSize": 0,
-                }
-            partition_map[partition_key]["fileCount"] += 1
-            partition_map[partition_key]["recordCount"] += file.get("recordCount", 0)
-            partition_map[partition_key]["totalSize"] += file.get("fileSizeInBytes", 0)
+        print(f"Total data files across all snapshots: {total_files}")
         
         partition_stats = list(partition_map.values())
         
-        # Calculate overall statistics
-        total_files = len(all_data_files)
-        total_records = sum(f.get("recordCount", 0) for f in all_data_files)
-        total_size = sum(f.get("fileSizeInBytes", 0) for f in all_data_files)
+        # Calculate overall statistics from the partition totals rather than re-walking every file
+        total_records = sum(stats["recordCount"] for stats in partition_stats)
+        total_size = sum(stats["totalSize"] for stats in partition_stats)
         
         # Return properly structured data
         table_name = path.split("/")[-1] if "/" in path else path
@@ -1014,7 +1258,7 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
             "currentSnapshotId": str(metadata_dict.get("current-snapshot-id", -1)),
             "snapshots": metadata_dict.get("snapshots", []),
             # Try to get data files from current snapshot for graph
-            "dataFiles": _get_manual_data_files(bucket, normalized_path, metadata_dict, project_id, token),
+            "dataFiles": get_manual_data_files(bucket, normalized_path, metadata_dict, project_id, token),
             "partitionStats": [],
             "metadataFiles": [], # Could populate this if we had the list from read_iceberg_metadata_manual
             "statistics": {
@@ -1026,10 +1270,35 @@ def analyze_with_pyiceberg_metadata(bucket: str, path: str, project_id: Optional
         }
     except Exception as e:
         print(f"PyIceberg analysis error: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.debug("PyIceberg analysis error", exc_info=True)
         return None
 
+# snapshot-id -> snapshot indexes keyed by metadata file location; a metadata file
+# is never rewritten, so its index never goes stale
+_snapshot_index_cache: LRUCache = LRUCache(maxsize=256)
+_snapshot_index_lock = threading.Lock()
+
+
+def get_snapshot(metadata_location: str, metadata: Dict[str, Any], snapshot_id: Any) -> Optional[Dict[str, Any]]:
+    """Look up a snapshot by id (int or string) without scanning the snapshot list"""
+    if snapshot_id is None:
+        return None
+    with _snapshot_index_lock:
+        index = _snapshot_index_cache.get(metadata_location)
+    if index is None:
+        index = {str(s.get("snapshot-id")): s for s in metadata.get("snapshots", [])}
+        with _snapshot_index_lock:
+            _snapshot_index_cache[metadata_location] = index
+    return index.get(str(snapshot_id))
+
+
+def _format_datetime_columns(df) -> None:
+    """Render the datetime columns of a sample DataFrame as strings, in place"""
+    # One dtype selection instead of a dtype check per column; wide tables have many non-datetime columns
+    for col in df.select_dtypes(include=["datetime", "datetimetz"]).columns:
+        df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
 def get_sample_data(
     bucket: str, 
     path: str, 
@@ -1055,44 +1324,27 @@ def get_sample_data(
 
         # Helper to read a specific parquet file
         def read_parquet_file(blob_path: str):
-            import pandas as pd
             try:
                 # Use gcsfs for efficient partial reads if available
-                import gcsfs
-                import pyarrow.parquet as pq
-                import warnings
+                if gcsfs is None:
+                    raise ImportError("gcsfs is not installed")
                 
-                # Suppress GCS project warning
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", category=UserWarning, module="gcsfs")
-                    
-                    # If token is not provided (using default creds), avoid passing project to prevent mismatch errors
-                    fs_project = project_id if token else None
-                    fs = gcsfs.GCSFileSystem(project=fs_project, token=token if token else 'google_default')
-                    gcs_path = f"gs://{bucket}/{blob_path}"
-                    
-                    # Use ParquetFile for single file reading (safer than read_table)
-                    pq_file = pq.ParquetFile(gcs_path, filesystem=fs)
-                    
-                    # Read only needed rows if possible (though we need to convert to pandas)
-                    # reading the first row group might be enough if it has enough rows
-                    # But for simplicity, let's read the file (or first few row groups)
-                    
-                    # If we just want head, we can read the first row group
-                    if pq_file.num_row_groups > 0:
-                        table = pq_file.read_row_group(0)
-                        if table.num_rows < limit and pq_file.num_row_groups > 1:
-                            # If first row group is small, read more or just read all
-                            table = pq_file.read()
-                    else:
-                        table = pq_file.read()
+                fs = get_gcs_filesystem(project_id=project_id, token=token)
+                gcs_path = f"gs://{bucket}/{blob_path}"
+
+                # Use ParquetFile for single file reading (safer than read_table)
+                pq_file = pq.ParquetFile(gcs_path, filesystem=fs)
 
-                    # Convert to pandas with limit
-                    df_head = table.slice(0, limit).to_pandas()
+                # Decode only the first batch of up to `limit` rows instead of whole row groups;
+                # batches span row group boundaries, so small row groups are still filled up
+                batch = next(pq_file.iter_batches(batch_size=limit), None)
+                if batch is None:
+                    # No rows: keep the columns
+                    df_head = pq_file.schema_arrow.empty_table().to_pandas()
+                else:
+                    df_head = batch.to_pandas()
                 
-                for col in df_head.columns:
-                    if pd.api.types.is_datetime64_any_dtype(df_head[col]):
-                        df_head[col] = df_head[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+                _format_datetime_columns(df_head)
                 
                 # Add file name column
                 # User wants "top folder/data/file"
@@ -1134,14 +1386,11 @@ def get_sample_data(
                 print(f"GCSFS sample failed, falling back to download: {gcs_err}")
                 # Fallback to downloading full file
                 blob = bucket_obj.blob(blob_path)
-                from io import BytesIO
                 content = blob.download_as_bytes()
                 df = pd.read_parquet(BytesIO(content))
                 df_head = df.head(limit)
                 
-                for col in df_head.columns:
-                    if pd.api.types.is_datetime64_any_dtype(df_head[col]):
-                        df_head[col] = df_head[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+                _format_datetime_columns(df_head)
                 
                 rows = df_head.to_dict(orient='records')
                 columns = list(df_head.columns)
@@ -1168,10 +1417,7 @@ def get_sample_data(
             
             manifest_data = []
             if FASTAVRO_AVAILABLE:
-                from io import BytesIO
-                import fastavro
-                manifest_bytes_io = BytesIO(content)
-                manifest_data = list(fastavro.reader(manifest_bytes_io))
+                manifest_data = list(_read_avro(content))
             
             if manifest_data:
                 first_entry = manifest_data[0]
@@ -1188,17 +1434,13 @@ def get_sample_data(
         
         # 1. Get metadata
         try:
-            metadata_dict, _, _ = read_iceberg_metadata_manual(bucket, path, project_id, token)
+            metadata_dict, metadata_location, _ = read_iceberg_metadata_manual(bucket, path, project_id, token)
             
             # 2. Get target snapshot
-            target_snapshot = None
-            if snapshot_id:
-                snapshots = metadata_dict.get("snapshots", [])
-                target_snapshot = next((s for s in snapshots if str(s.get("snapshot-id")) == str(snapshot_id)), None)
-            else:
-                current_snapshot_id = metadata_dict.get("current-snapshot-id")
-                snapshots = metadata_dict.get("snapshots", [])
-                target_snapshot = next((s for s in snapshots if s.get("snapshot-id") == current_snapshot_id), None)
+            target_snapshot = get_snapshot(
+                metadata_location, metadata_dict,
+                snapshot_id if snapshot_id else metadata_dict.get("current-snapshot-id")
+            )
             
             if target_snapshot:
                 manifest_list = target_snapshot.get("manifest-list")
@@ -1210,10 +1452,7 @@ def get_sample_data(
                     
                     manifest_list_data = []
                     if FASTAVRO_AVAILABLE:
-                        from io import BytesIO
-                        import fastavro
-                        manifest_bytes_io = BytesIO(content)
-                        manifest_list_data = list(fastavro.reader(manifest_bytes_io))
+                        manifest_list_data = list(_read_avro(content))
                     
                     # 3. Pick first manifest
                     if manifest_list_data:
@@ -1227,8 +1466,7 @@ def get_sample_data(
                             
                             manifest_data = []
                             if FASTAVRO_AVAILABLE:
-                                manifest_bytes_io = BytesIO(content)
-                                manifest_data = list(fastavro.reader(manifest_bytes_io))
+                                manifest_data = list(_read_avro(content))
                             
                             # 4. Iterate through data files until limit is reached
                             all_rows = []
@@ -1239,6 +1477,9 @@ def get_sample_data(
                             data_files_list = []
                             if manifest_data:
                                 for entry in manifest_data:
+                                    # Skip deleted files
+                                    if entry.get("status") == 2: # DELETED
+                                        continue
                                     d_file = entry.get("data_file") or entry
                                     f_p = d_file.get("file_path") or d_file.get("filePath")
                                     if f_p:
@@ -1298,7 +1539,7 @@ def get_sample_data(
                 else:
                     full_metadata_location = metadata_location
                 
-                table = StaticTable.from_metadata(full_metadata_location)
+                table = get_static_table(metadata_dict, full_metadata_location, token)
                 scan = table.scan(limit=limit)
                 arrow_table = scan.to_arrow()
                 pydict = arrow_table.to_pydict()
@@ -1336,7 +1577,6 @@ def get_sample_data(
         # Fallback 2: Manual listing (slowest) - only if no specific target
         if not snapshot_id:
             try:
-                import pandas as pd
                 client = get_storage_client(project_id=project_id, token=token)
                 bucket_obj = client.bucket(bucket)
                 normalized_path = path.strip("/")
@@ -1368,6 +1608,11 @@ def get_sample_data(
         print(f"Get sample data failed: {e}")
         return empty_result
 
+# Data files of a snapshot, keyed by (bucket, table path, snapshot id, token digest)
+_manual_data_files_cache: TTLCache = TTLCache(maxsize=1024, ttl=600)
+_manual_data_files_lock = threading.Lock()
+
+
 def get_manual_data_files(bucket: str, path: str, metadata: Dict[str, Any], project_id: Optional[str] = None, token: Optional[str] = None) -> List[Dict[str, Any]]:
     """Helper to get data files from current snapshot using manual parsing"""
     try:
@@ -1385,10 +1630,23 @@ def get_manual_data_files(bucket: str, path: str, metadata: Dict[str, Any], proj
         if not manifest_list:
             return []
             
+        # A snapshot is immutable, so its data files can be reused until the entry expires;
+        # entries are per caller, since only the caller's own reads prove access to the manifests
+        cache_key = (bucket, path.strip("/"), current_snapshot_id, token_digest(token))
+        with _manual_data_files_lock:
+            cached = _manual_data_files_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Get data files with a limit to avoid performance issues
         # We'll fetch up to 100 files which should be enough for the graph
-        files = get_manifest_files(bucket, path, manifest_list, project_id, token)
-        return files[:100]
+        files = get_manifest_files(bucket, path, manifest_list, project_id, token)[:100]
+
+        # An empty list may come from a swallowed read error, so only cache real results
+        if files:
+            with _manual_data_files_lock:
+                _manual_data_files_cache[cache_key] = files
+        return files
     except Exception as e:
         print(f"Error getting manual data files: {e}")
         return []
@@ -1398,13 +1656,10 @@ def compare_snapshots(bucket: str, path: str, snapshot_id_1: str, snapshot_id_2:
     """Compare two snapshots and return the differences"""
     try:
         # Get metadata
-        metadata_dict, _, _ = read_iceberg_metadata_manual(bucket, path, project_id, token)
-        
-        snapshots = metadata_dict.get("snapshots", [])
+        metadata_dict, metadata_location, _ = read_iceberg_metadata_manual(bucket, path, project_id, token)
         
         # Find the snapshots
-        snap1 = None
-        snap2 = None
+        snap2 = get_snapshot(metadata_location, metadata_dict, snapshot_id_2)
         
         # Handle empty snapshot_id_1 (start of history)
         if not snapshot_id_1:
@@ -1414,13 +1669,8 @@ def compare_snapshots(bucket: str, path: str, snapshot_id_1: str, snapshot_id_2:
                 "summary": {},
                 "manifest-list": ""
             }
-        
-        for snap in snapshots:
-            sid = str(snap.get("snapshot-id"))
-            if sid == snapshot_id_1:
-                snap1 = snap
-            if sid == snapshot_id_2:
-                snap2 = snap
+        else:
+            snap1 = get_snapshot(metadata_location, metadata_dict, snapshot_id_1)
         
         if not snap2:
             raise ValueError(f"Snapshot {snapshot_id_2} not found")
@@ -1469,16 +1719,18 @@ def compare_snapshots(bucket: str, path: str, snapshot_id_1: str, snapshot_id_2:
                 removed_files.append(file1)
                 
         # Calculate statistics
+        record_count1, total_size1 = _file_totals(files1)
         stats1 = {
             "fileCount": len(files1),
-            "recordCount": sum(f["recordCount"] for f in files1),
-            "totalSize": sum(f["fileSizeInBytes"] for f in files1)
+            "recordCount": record_count1,
+            "totalSize": total_size1
         }
         
+        record_count2, total_size2 = _file_totals(files2)
         stats2 = {
             "fileCount": len(files2),
-            "recordCount": sum(f["recordCount"] for f in files2),
-            "totalSize": sum(f["fileSizeInBytes"] for f in files2)
+            "recordCount": record_count2,
+            "totalSize": total_size2
         }
         
         delta = {
@@ -1518,6 +1770,5 @@ def compare_snapshots(bucket: str, path: str, snapshot_id_1: str, snapshot_id_2:
 
     except Exception as e:
         print(f"Compare snapshots failed: {e}")
-        import traceback
-        print(traceback.format_exc())
+        logger.debug("Compare snapshots failed", exc_info=True)
         raise e
@@ -0,0 +1,44 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+from cachetools import TTLCache
+from ..core.security import token_digest
+
+# Listings are short-lived: long enough for back/forward navigation, short enough to pick up new tables
+LISTING_CACHE_TTL_SECONDS = 30
+LISTING_CACHE_SIZE = 1024
+
+_listing_cache = TTLCache(maxsize=LISTING_CACHE_SIZE, ttl=LISTING_CACHE_TTL_SECONDS)
+_listing_locks: Dict[Tuple[Hashable, ...], asyncio.Lock] = {}
+
+
+async def cached_listing(
+    kind: str,
+    bucket: str,
+    prefix: str,
+    project_id: Optional[str],
+    token: Optional[str],
+    compute: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Return a bucket listing result, computing it at most once per key and TTL
+
+    compute is a blocking callable run in a worker thread. Concurrent requests
+    for the same key wait for the first one instead of listing GCS again.
+    Failures propagate and are not cached.
+    """
+    key = (kind, bucket, prefix, project_id, token_digest(token))
+    cached = _listing_cache.get(key)
+    if cached is not None:
+        return cached
+
+    lock = _listing_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            cached = _listing_cache.get(key)
+            if cached is not None:
+                return cached
+            result = await asyncio.to_thread(compute)
+            _listing_cache[key] = result
+            return result
+    finally:
+        if not lock.locked():
+            _listing_locks.pop(key, None)
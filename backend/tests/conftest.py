@@ -2,8 +2,28 @@ import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from main import app
+from app.routers import analyze, bigquery, projects
+from app.services import gcs, iceberg, listing_cache
 
 @pytest_asyncio.fixture
 async def client():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty in-process caches"""
+    analyze._analyze_cache.clear()
+    analyze._analyze_payload_cache.clear()
+    iceberg._manual_data_files_cache.clear()
+    iceberg._snapshot_index_cache.clear()
+    iceberg._static_table_cache.clear()
+    iceberg._metadata_dict_cache.clear()
+    gcs.clear_clients()
+    listing_cache._listing_cache.clear()
+    bigquery._bigquery_clients.clear()
+    projects._projects_cache.clear()
+    projects._gcloud_cache.clear()
+    projects._projects_refreshing.clear()
+    projects._semaphores.clear()
+    yield
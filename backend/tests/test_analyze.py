@@ -0,0 +1,104 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from google.api_core.exceptions import Forbidden
+from app.core.http import dumps_json
+from app.routers.analyze import _extract_schema_fields, _extract_partition_spec, _extract_sort_order, _limit_snapshots
+
+
+def test_extract_uses_current_schema_and_default_spec():
+    """Only the schema/spec/sort order referenced by the default ids is extracted"""
+    metadata = {
+        "current-schema-id": 1,
+        "schemas": [
+            {"schema-id": 0, "fields": [{"id": 1, "name": "old", "type": "int", "required": False}]},
+            {"schema-id": 1, "fields": [
+                {"id": 1, "name": "id", "type": "long", "required": True},
+                {"id": 2, "name": "tags", "type": {"type": "list", "element-id": 3, "element": "string"}, "required": False},
+            ]},
+        ],
+        "default-spec-id": 0,
+        "partition-specs": [
+            {"spec-id": 0, "fields": [{"field-id": 1000, "source-id": 1, "name": "id_bucket", "transform": "bucket[4]"}]},
+        ],
+        "default-sort-order-id": 1,
+        "sort-orders": [
+            {"order-id": 0, "fields": []},
+            {"order-id": 1, "fields": [{"field-id": 1, "direction": "desc", "null-order": "nulls-last"}]},
+        ],
+    }
+
+    schema = _extract_schema_fields(metadata)
+    assert [f["name"] for f in schema] == ["id", "tags"]
+    assert schema[0]["type"] == "long"
+    assert schema[1]["type"] == "list<list>"
+
+    assert _extract_partition_spec(metadata) == [
+        {"fieldId": 1000, "sourceId": 1, "name": "id_bucket", "transform": "bucket[4]"}
+    ]
+    assert _extract_sort_order(metadata)[0]["direction"] == "desc"
+
+
+def test_extract_v1_singular_keys():
+    """Format v1 metadata with "schema" / "partition-spec" is still supported"""
+    metadata = {
+        "schema": {"fields": [{"id": 1, "name": "x", "type": "int", "optional": False}]},
+        "partition-spec": {"fields": []},
+    }
+
+    assert _extract_schema_fields(metadata) == [
+        {"id": 1, "name": "x", "type": "int", "required": True, "doc": None}
+    ]
+    assert _extract_partition_spec(metadata) == []
+    assert _extract_sort_order(metadata) == []
+
+
+def test_limit_snapshots_keeps_newest():
+    """Only the newest snapshots are returned and the cached dict is left intact"""
+    result = {"tableName": "t", "snapshots": [{"snapshotId": str(i)} for i in range(5)]}
+
+    limited = _limit_snapshots(result, 2)
+    assert [s["snapshotId"] for s in limited["snapshots"]] == ["3", "4"]
+    assert limited["totalSnapshots"] == 5
+    assert len(result["snapshots"]) == 5
+
+    # 0 disables the limit
+    assert _limit_snapshots(result, 0) is result
+
+
+@pytest.mark.asyncio
+async def test_list_table_snapshots_paginates(client):
+    """/analyze/snapshots pages through the raw metadata snapshots"""
+    metadata = {
+        "snapshots": [
+            {"snapshot-id": 100 + i, "timestamp-ms": 1700000000000 + i, "manifest-list": f"gs://b/t/metadata/snap-{i}.avro"}
+            for i in range(5)
+        ]
+    }
+
+    with patch("app.routers.analyze.read_iceberg_metadata_manual", return_value=(metadata, "", [])):
+        response = await client.get("/api/backend/analyze/snapshots?bucket=b&path=t&offset=1&limit=2")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [s["snapshotId"] for s in data["snapshots"]] == ["101", "102"]
+    assert data["snapshots"][0]["sequenceNumber"] == 2
+
+
+@pytest.mark.asyncio
+async def test_list_table_snapshots_maps_permission_errors(client):
+    """/analyze/snapshots reports access errors like /analyze instead of a 404"""
+    with patch("app.routers.analyze.read_iceberg_metadata_manual", side_effect=Forbidden("denied")):
+        response = await client.get("/api/backend/analyze/snapshots?bucket=b&path=t")
+    assert response.status_code == 403
+
+    with patch("app.routers.analyze.read_iceberg_metadata_manual", side_effect=Exception("no metadata")):
+        response = await client.get("/api/backend/analyze/snapshots?bucket=b&path=t")
+    assert response.status_code == 404
+
+
+def test_dumps_json_falls_back_for_unsupported_types():
+    """Values orjson cannot encode natively still serialize like FastAPI would"""
+    body = dumps_json({"partition": {"amount": Decimal("1.5")}, "columnSizes": {1: 10}, "tags": {"a"}})
+    assert body == b'{"partition":{"amount":1.5},"columnSizes":{"1":10},"tags":["a"]}'
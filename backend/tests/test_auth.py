@@ -42,3 +42,40 @@ def test_get_storage_client_env_var():
                 
                 # Verify from_service_account_json was called
                 mock_from_json.assert_called_with(fake_path, project=project_id)
+
+def test_get_storage_client_reused_per_credentials():
+    """The same credentials reuse one client; a different token gets its own"""
+    with patch("app.services.gcs.storage.Client") as mock_client:
+        mock_client.side_effect = lambda **kwargs: MagicMock()
+        with patch("google.oauth2.credentials.Credentials"):
+            first = get_storage_client(project_id="test-project", token="token-a")
+            second = get_storage_client(project_id="test-project", token="token-a")
+            other = get_storage_client(project_id="test-project", token="token-b")
+
+    assert first is second
+    assert other is not first
+    assert mock_client.call_count == 2
+
+def test_get_resource_manager_client_reused_per_token():
+    """Resource Manager clients are cached per token like storage clients"""
+    from app.services.gcs import get_resource_manager_client
+
+    with patch("app.services.gcs.resourcemanager_v3.ProjectsClient") as mock_client:
+        mock_client.side_effect = lambda **kwargs: MagicMock()
+        with patch("google.oauth2.credentials.Credentials"):
+            first = get_resource_manager_client(token="token-a")
+            second = get_resource_manager_client(token="token-a")
+
+    assert first is second
+    assert mock_client.call_count == 1
+
+def test_client_cache_keys_do_not_hold_raw_tokens():
+    """Cached clients are keyed by a token digest so raw bearer tokens are not kept as keys"""
+    from app.services import gcs
+
+    with patch("app.services.gcs.storage.Client"):
+        with patch("google.oauth2.credentials.Credentials"):
+            get_storage_client(project_id="test-project", token="secret-token")
+
+    assert gcs._storage_clients
+    assert all("secret-token" not in key for key in gcs._storage_clients.keys())
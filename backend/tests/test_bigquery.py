@@ -73,3 +73,88 @@ async def test_search_iceberg_tables_error_handling(client):
         # The endpoint catches exceptions and raises HTTPException 500
         assert response.status_code == 500
         assert "Error searching Iceberg tables" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_search_iceberg_tables_skips_failing_dataset(client):
+    """A dataset that fails to list does not abort the scan of the others"""
+    project_id = "test-project"
+
+    with patch("app.routers.bigquery.get_bigquery_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        good_dataset = MagicMock()
+        good_dataset.dataset_id = "good"
+        bad_dataset = MagicMock()
+        bad_dataset.dataset_id = "bad"
+        mock_client.list_datasets.return_value = [bad_dataset, good_dataset]
+        mock_client.dataset.side_effect = lambda dataset_id, project=None: dataset_id
+
+        mock_table = MagicMock()
+        mock_table.table_type = "EXTERNAL"
+
+        def list_tables(dataset_ref, **kwargs):
+            if dataset_ref == "bad":
+                raise Exception("Access Denied")
+            return [mock_table]
+        mock_client.list_tables.side_effect = list_tables
+
+        mock_table_details = MagicMock()
+        mock_table_details.table_id = "events"
+        mock_table_details.created = None
+        mock_table_details.external_data_configuration.source_format = "ICEBERG"
+        mock_table_details.external_data_configuration.source_uris = ["gs://bucket/events"]
+        mock_client.get_table.return_value = mock_table_details
+
+        response = await client.get(f"/api/backend/bigquery/search-iceberg?project_id={project_id}")
+
+        assert response.status_code == 200
+        tables = response.json()["tables"]
+        assert [t["full_table_id"] for t in tables] == ["test-project.good.events"]
+
+@pytest.mark.asyncio
+async def test_search_iceberg_tables_information_schema(client):
+    """Datasets with known locations are searched with one query per region"""
+    project_id = "test-project"
+
+    with patch("app.routers.bigquery.get_bigquery_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        mock_dataset = MagicMock()
+        mock_dataset.dataset_id = "test_dataset"
+        mock_dataset._properties = {"location": "US"}
+        mock_client.list_datasets.return_value = [mock_dataset, mock_dataset]
+
+        mock_row = MagicMock()
+        mock_row.table_schema = "test_dataset"
+        mock_row.table_name = "test_table"
+        mock_row.creation_time = None
+        mock_row.uris = '["gs://bucket/path/metadata/v1.metadata.json"]'
+        mock_client.query.return_value.result.return_value = [mock_row]
+
+        response = await client.get(f"/api/backend/bigquery/search-iceberg?project_id={project_id}")
+
+        assert response.status_code == 200
+        tables = response.json()["tables"]
+        assert len(tables) == 1
+        assert tables[0]["full_table_id"] == "test-project.test_dataset.test_table"
+        assert tables[0]["location"] == "gs://bucket/path/metadata/v1.metadata.json"
+        mock_client.query.assert_called_once()
+        assert "region-us.INFORMATION_SCHEMA" in mock_client.query.call_args[0][0]
+        mock_client.get_table.assert_not_called()
+
+def test_get_bigquery_client_reused_per_token_and_project():
+    """Clients are cached per (token, project) rather than rebuilt per request"""
+    from app.routers.bigquery import get_bigquery_client
+
+    with patch("app.routers.bigquery.bigquery.Client") as mock_client:
+        mock_client.side_effect = lambda **kwargs: MagicMock()
+        with patch("app.routers.bigquery.Credentials"):
+            first = get_bigquery_client(token="token-a", project_id="test-project")
+            second = get_bigquery_client(token="token-a", project_id="test-project")
+            other_project = get_bigquery_client(token="token-a", project_id="other-project")
+
+    assert first is second
+    assert other_project is not first
+    assert mock_client.call_count == 2
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from app.services.iceberg import (
+    get_manifest_files, get_manual_data_files, get_snapshot, read_iceberg_metadata_manual, _slim_snapshot, _manifest_data_file,
+    _partition_display_name, parse_metadata_version, _windowed_map,
+)
+
+
+def test_get_manual_data_files_cached_per_snapshot():
+    """Manifests of an unchanged snapshot are only read once"""
+    metadata = {
+        "current-snapshot-id": 1,
+        "snapshots": [{"snapshot-id": 1, "manifest-list": "gs://b/t/metadata/snap-1.avro"}],
+    }
+    files = [{"filePath": "gs://b/t/data/f1.parquet", "recordCount": 1, "fileSizeInBytes": 10}]
+
+    with patch("app.services.iceberg.get_manifest_files", return_value=files) as mock_manifests:
+        assert get_manual_data_files("b", "t", metadata) == files
+        assert get_manual_data_files("b", "t", metadata) == files
+        assert mock_manifests.call_count == 1
+
+        # A new current snapshot is a cache miss
+        metadata["current-snapshot-id"] = 2
+        metadata["snapshots"].append({"snapshot-id": 2, "manifest-list": "gs://b/t/metadata/snap-2.avro"})
+        get_manual_data_files("b", "t", metadata)
+        assert mock_manifests.call_count == 2
+
+        # Another caller reads the manifests with their own credentials
+        get_manual_data_files("b", "t", metadata, token="other-token")
+        assert mock_manifests.call_count == 3
+
+
+def test_get_snapshot_accepts_int_and_string_ids():
+    """Snapshots are found by id regardless of how the id was passed in"""
+    metadata = {"snapshots": [{"snapshot-id": 5}, {"snapshot-id": 7}]}
+    location = "gs://b/t/metadata/v2.metadata.json"
+
+    assert get_snapshot(location, metadata, 7)["snapshot-id"] == 7
+    assert get_snapshot(location, metadata, "5")["snapshot-id"] == 5
+    assert get_snapshot(location, metadata, "9") is None
+    assert get_snapshot(location, metadata, None) is None
+
+
+def test_slim_snapshot_drops_engine_specific_summary():
+    """Structural keys and standard metrics survive, engine bookkeeping does not"""
+    snapshot = {
+        "snapshot-id": 1,
+        "timestamp-ms": 1700000000000,
+        "manifest-list": "gs://b/t/metadata/snap-1.avro",
+        "schema-id": 0,
+        "summary": {"operation": "append", "total-records": "10", "spark.app.id": "local-1"},
+    }
+
+    slim = _slim_snapshot(snapshot)
+    assert slim["manifest-list"] == snapshot["manifest-list"]
+    assert slim["schema-id"] == 0
+    assert slim["summary"] == {"operation": "append", "total-records": "10"}
+
+
+def test_manifest_data_file_extracts_entry():
+    """Avro manifest entries map to data file summaries; entries without a path are skipped"""
+    entry = {
+        "status": 1,
+        "data_file": {
+            "file_path": "gs://b/t/data/f1.parquet",
+            "file_format": "PARQUET",
+            "partition": {"day": 19000},
+            "record_count": 5,
+            "file_size_in_bytes": 1024,
+        },
+    }
+
+    data_file = _manifest_data_file(entry)
+    assert data_file["filePath"] == "gs://b/t/data/f1.parquet"
+    assert data_file["fileFormat"] == "PARQUET"
+    assert data_file["partition"] == {"day": 19000}
+    assert data_file["recordCount"] == 5
+    assert data_file["fileSizeInBytes"] == 1024
+    assert _manifest_data_file({"data_file": {"record_count": 1}}) is None
+
+
+def test_read_metadata_manual_reuses_parsed_generation():
+    """The same metadata file generation is downloaded and parsed only once"""
+    blob = MagicMock()
+    blob.name = "t/metadata/v1.metadata.json"
+    blob.generation = 1
+    blob.updated = None
+    blob.download_as_bytes.return_value = b'{"format-version": 2, "current-snapshot-id": 5, "snapshots": []}'
+
+    with patch("app.services.iceberg.get_storage_client") as mock_get_client:
+        mock_get_client.return_value.bucket.return_value.list_blobs.return_value = [blob]
+
+        first, location, _ = read_iceberg_metadata_manual("b", "t")
+        second, _, _ = read_iceberg_metadata_manual("b", "t")
+
+        assert location == "gs://b/t/metadata/v1.metadata.json"
+        assert second == first
+        assert blob.download_as_bytes.call_count == 1
+
+        # Another caller must download (and so be authorized for) the file itself
+        read_iceberg_metadata_manual("b", "t", token="other-token")
+        assert blob.download_as_bytes.call_count == 2
+
+
+def test_partition_display_name():
+    """Partition labels are only formatted for the groups that are emitted"""
+    class Record:
+        def __repr__(self):
+            return "Record[day=19000]"
+
+    assert _partition_display_name((19000,), Record()) == "[day=19000]"
+    assert _partition_display_name((), None) == "Unpartitioned"
+    assert _partition_display_name(None, None) == "Unknown Partition"
+
+
+def test_parse_metadata_version():
+    assert parse_metadata_version("v12.metadata.json") == 12
+    assert parse_metadata_version("00003-1b2c-4d5e.metadata.json") == 3
+    assert parse_metadata_version("metadata.json") == -1
+
+
+def test_get_manifest_files_reports_corrupt_manifest_list_block(caplog):
+    """A decode error past the Avro header is logged instead of silently dropping the snapshot"""
+    def records():
+        yield {"manifest_path": "gs://b/t/metadata/m1.avro"}
+        raise ValueError("corrupt block")
+
+    with patch("app.services.iceberg.get_storage_client"), \
+            patch("app.services.iceberg.FASTAVRO_AVAILABLE", True), \
+            patch("app.services.iceberg._download_blob", return_value=b"avro"), \
+            patch("app.services.iceberg._read_avro", return_value=records()), \
+            caplog.at_level("DEBUG", logger="app.services.iceberg"):
+        assert get_manifest_files("b", "t", "gs://b/t/metadata/snap-1.avro") == []
+
+    assert "manifest list parsing failed" in caplog.text
+
+
+def test_windowed_map_keeps_order_and_bounds_submissions():
+    """Results come back in input order with at most `window` calls outstanding"""
+    submitted = []
+
+    def work(item):
+        submitted.append(item)
+        return item * 2
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = _windowed_map(executor, work, range(10), 3)
+        assert next(results) == 0
+        assert len(submitted) <= 3
+        assert list(results) == [2 * i for i in range(1, 10)]
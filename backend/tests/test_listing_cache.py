@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from app.services.listing_cache import cached_listing
+
+
+@pytest.mark.asyncio
+async def test_cached_listing_coalesces_concurrent_requests():
+    """Concurrent identical listings compute once and share the result"""
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"tables": []}
+
+    results = await asyncio.gather(
+        *(cached_listing("discover", "bucket", "", "proj", "token", compute) for _ in range(5))
+    )
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cached_listing_keys_on_token_and_skips_failures():
+    """Different credentials get their own entry; failures are retried"""
+    def fail():
+        raise RuntimeError("403 Forbidden")
+
+    with pytest.raises(RuntimeError):
+        await cached_listing("browse", "bucket", "a", "proj", "token-a", fail)
+
+    first = await cached_listing("browse", "bucket", "a", "proj", "token-a", lambda: {"items": [1]})
+    second = await cached_listing("browse", "bucket", "a", "proj", "token-b", lambda: {"items": [2]})
+
+    assert first == {"items": [1]}
+    assert second == {"items": [2]}
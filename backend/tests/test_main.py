@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 @pytest.mark.asyncio
 async def test_root(client):
@@ -60,3 +60,131 @@ async def test_analyze_table_with_token(client):
         mock_analyze.assert_called_once()
         _, kwargs = mock_analyze.call_args
         assert kwargs.get("token") == token
+
+@pytest.mark.asyncio
+async def test_analyze_table_cached_per_metadata_generation(client):
+    """Repeat analyze calls reuse the response until the metadata file changes"""
+    bucket = "test-bucket"
+    path = "test-table"
+
+    latest_blob = MagicMock()
+    latest_blob.name = f"{path}/metadata/v1.metadata.json"
+    latest_blob.generation = 1
+
+    with patch("app.routers.analyze.get_latest_metadata_blob", return_value=latest_blob), \
+         patch("app.routers.analyze.analyze_with_pyiceberg_metadata") as mock_analyze:
+        mock_analyze.return_value = {"tableName": "test-table"}
+
+        first = await client.get(f"/api/backend/analyze?bucket={bucket}&path={path}")
+        second = await client.get(f"/api/backend/analyze?bucket={bucket}&path={path}")
+        assert first.json() == second.json()
+        assert mock_analyze.call_count == 1
+
+        # A new commit produces a new metadata generation and must be re-analyzed
+        latest_blob.generation = 2
+        await client.get(f"/api/backend/analyze?bucket={bucket}&path={path}")
+        assert mock_analyze.call_count == 2
+
+@pytest.mark.asyncio
+async def test_analyze_table_cache_scoped_per_caller(client):
+    """A cached analysis is never served to a different caller"""
+    latest_blob = MagicMock()
+    latest_blob.name = "test-table/metadata/v1.metadata.json"
+    latest_blob.generation = 1
+
+    with patch("app.routers.analyze.get_latest_metadata_blob", return_value=latest_blob), \
+         patch("app.routers.analyze.analyze_with_pyiceberg_metadata") as mock_analyze:
+        mock_analyze.return_value = {"tableName": "test-table"}
+
+        await client.get("/api/backend/analyze?bucket=b&path=test-table", headers={"Authorization": "Bearer token-a"})
+        await client.get("/api/backend/analyze?bucket=b&path=test-table", headers={"Authorization": "Bearer token-b"})
+        assert mock_analyze.call_count == 2
+
+@pytest.mark.asyncio
+async def test_analyze_table_etag_not_modified(client):
+    """A client presenting the current ETag gets an empty 304"""
+    bucket = "test-bucket"
+    path = "test-table"
+
+    latest_blob = MagicMock()
+    latest_blob.name = f"{path}/metadata/v1.metadata.json"
+    latest_blob.generation = 1
+
+    with patch("app.routers.analyze.get_latest_metadata_blob", return_value=latest_blob), \
+         patch("app.routers.analyze.analyze_with_pyiceberg_metadata") as mock_analyze:
+        mock_analyze.return_value = {"tableName": "test-table"}
+
+        first = await client.get(f"/api/backend/analyze?bucket={bucket}&path={path}")
+        etag = first.headers["etag"]
+
+        second = await client.get(
+            f"/api/backend/analyze?bucket={bucket}&path={path}",
+            headers={"If-None-Match": etag},
+        )
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+@pytest.mark.asyncio
+async def test_discover_tables_stops_at_limit(client):
+    """Discovery streams the listing and stops once the table limit is reached"""
+    blobs = []
+    for i in range(5):
+        blob = MagicMock()
+        blob.name = f"warehouse/t{i}/metadata/00000-abc.metadata.json"
+        blobs.append(blob)
+
+    with patch("app.routers.buckets.get_storage_client") as mock_get_client, \
+         patch("app.routers.buckets.MAX_DISCOVERED_TABLES", 2):
+        mock_get_client.return_value.bucket.return_value.list_blobs.return_value = iter(blobs)
+
+        response = await client.get("/api/backend/discover?bucket=test-bucket")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [t["path"] for t in data["tables"]] == ["warehouse/t0", "warehouse/t1"]
+        assert data["truncated"] is True
+
+@pytest.mark.asyncio
+async def test_discover_tables_at_limit_not_truncated(client):
+    """Extra metadata versions of the last table under the cap do not mark the result truncated"""
+    names = [
+        "warehouse/t0/metadata/00000-abc.metadata.json",
+        "warehouse/t1/metadata/00000-abc.metadata.json",
+        "warehouse/t1/metadata/00001-def.metadata.json",
+    ]
+    blobs = []
+    for name in names:
+        blob = MagicMock()
+        blob.name = name
+        blobs.append(blob)
+
+    with patch("app.routers.buckets.get_storage_client") as mock_get_client, \
+         patch("app.routers.buckets.MAX_DISCOVERED_TABLES", 2):
+        mock_get_client.return_value.bucket.return_value.list_blobs.return_value = iter(blobs)
+
+        response = await client.get("/api/backend/discover?bucket=test-bucket")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [t["path"] for t in data["tables"]] == ["warehouse/t0", "warehouse/t1"]
+        assert data["truncated"] is False
+
+
+def test_browse_detects_tables_with_server_side_glob():
+    """Table detection only lists metadata files of direct child folders"""
+    from app.routers.browse import _browse_bucket
+
+    listing = MagicMock()
+    listing.__iter__.return_value = iter([])
+    listing.prefixes = {"wh/orders/", "wh/raw/"}
+    metadata_blob = MagicMock()
+    metadata_blob.name = "wh/orders/metadata/v1.metadata.json"
+
+    client = MagicMock()
+    client.list_blobs.side_effect = [listing, iter([metadata_blob])]
+
+    result = _browse_bucket(client, MagicMock(), "b", "wh", None)
+
+    assert client.list_blobs.call_args.kwargs["match_glob"] == "wh/*/metadata/*.metadata.json"
+    assert [(item["name"], item["type"]) for item in result["items"]] == [("orders", "iceberg_table"), ("raw", "folder")]
@@ -0,0 +1,122 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+def _mock_project(project_id, state=1):
+    """A search_projects result; state 1 is Project.State.ACTIVE"""
+    project = MagicMock()
+    project.project_id = project_id
+    project.display_name = project_id.title()
+    project.state = state
+    return project
+
+
+@pytest.mark.asyncio
+async def test_list_projects_cached_per_token(client):
+    """Repeat calls with the same token are served without calling Resource Manager again"""
+    with patch("app.routers.projects.get_resource_manager_client") as mock_get_client:
+        mock_get_client.return_value.search_projects.return_value = [_mock_project("alpha")]
+
+        headers = {"Authorization": "Bearer token-a"}
+        first = await client.get("/api/backend/projects", headers=headers)
+        second = await client.get("/api/backend/projects", headers=headers)
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert [p["id"] for p in first.json()["projects"]] == ["alpha"]
+        assert mock_get_client.return_value.search_projects.call_count == 1
+
+        await client.get("/api/backend/projects", headers={"Authorization": "Bearer token-b"})
+        assert mock_get_client.return_value.search_projects.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_list_projects_merges_fallbacks(client):
+    """When Resource Manager finds nothing, the fallbacks run and failures are skipped"""
+    with patch("app.routers.projects.get_resource_manager_client", return_value=None), \
+         patch("app.routers.projects.asyncio.create_subprocess_exec", side_effect=FileNotFoundError("gcloud")), \
+         patch("app.routers.projects.get_storage_client") as mock_storage, \
+         patch.dict("os.environ", {}, clear=True):
+        mock_storage.return_value.project = "fallback-project"
+
+        response = await client.get("/api/backend/projects")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [p["id"] for p in data["projects"]] == ["fallback-project"]
+        assert data["active_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_projects_state_names(client):
+    """Inactive projects are reported by state name and only shown when nothing is active"""
+    with patch("app.routers.projects.get_resource_manager_client") as mock_get_client:
+        mock_get_client.return_value.search_projects.return_value = [_mock_project("old", state=2)]
+
+        response = await client.get("/api/backend/projects")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["projects"] == [{"id": "old", "name": "Old", "state": "DELETE_REQUESTED"}]
+        assert data["active_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_projects_not_modified(client):
+    """A matching If-None-Match gets a 304 with the same ETag"""
+    with patch("app.routers.projects.get_resource_manager_client") as mock_get_client:
+        mock_get_client.return_value.search_projects.return_value = [_mock_project("alpha")]
+
+        first = await client.get("/api/backend/projects")
+        etag = first.headers["etag"]
+
+        second = await client.get("/api/backend/projects", headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert mock_get_client.return_value.search_projects.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_list_projects_stale_entry_refreshed_in_background(client):
+    """A stale entry is returned immediately while a single refresh runs behind it"""
+    import asyncio
+    from app.routers import projects
+
+    with patch("app.routers.projects.get_resource_manager_client") as mock_get_client:
+        search = mock_get_client.return_value.search_projects
+        search.return_value = [_mock_project("alpha")]
+        await client.get("/api/backend/projects")
+
+        # Age the entry past the fresh window
+        key = projects._projects_cache_key(None)
+        fetched_at, etag, result = projects._projects_cache[key]
+        projects._projects_cache[key] = (fetched_at - projects.PROJECTS_CACHE_FRESH_SECONDS - 1, etag, result)
+
+        search.return_value = [_mock_project("beta")]
+        stale = await client.get("/api/backend/projects")
+        assert [p["id"] for p in stale.json()["projects"]] == ["alpha"]
+
+        await asyncio.gather(*projects._refresh_tasks)
+        assert search.call_count == 2
+
+        fresh = await client.get("/api/backend/projects")
+        assert [p["id"] for p in fresh.json()["projects"]] == ["beta"]
+        assert search.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_list_projects_inactive_only_skips_fallbacks(client):
+    """Resource Manager results without active projects still skip the fallback sources"""
+    with patch("app.routers.projects.get_resource_manager_client") as mock_get_client, \
+         patch("app.routers.projects.asyncio.create_subprocess_exec") as mock_exec, \
+         patch("app.routers.projects.get_storage_client") as mock_storage:
+        mock_get_client.return_value.search_projects.return_value = [_mock_project("retired", state=2)]
+
+        response = await client.get("/api/backend/projects")
+
+        assert response.status_code == 200
+        assert response.json()["active_count"] == 0
+        assert [p["id"] for p in response.json()["projects"]] == ["retired"]
+        mock_exec.assert_not_called()
+        mock_storage.assert_not_called()
@@ -75,7 +75,7 @@ export default function MetadataView({ metadata }: MetadataViewProps) {
             <Calendar className="h-5 w-5 text-indigo-500" />
             <h3 className="font-semibold text-gray-800 dark:text-white">Snapshots</h3>
           </div>
-          <p className="text-gray-600 dark:text-gray-300">{metadata.snapshots.length}</p>
+          <p className="text-gray-600 dark:text-gray-300">{metadata.totalSnapshots ?? metadata.snapshots.length}</p>
         </div>
       </div>
 
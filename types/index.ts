@@ -16,6 +16,7 @@ export interface TableMetadata {
   properties: Record<string, string>;
   currentSnapshotId: string | number;  // String for large integers, number for -1
   snapshots: Snapshot[];
+  totalSnapshots?: number;  // Set when /analyze was asked for only the newest snapshots
   dataFiles: DataFile[];
   partitionStats: PartitionStats[];
   statistics?: {